@@ -47,6 +47,9 @@ MULTIMODAL_STRATEGY = "never"
 # Monitor 0 is a "virtual" monitor contains all monitor screens.
 PRIMARY_MONITOR = 0
 
+# Screenshots wider than this are downscaled before being sent. The model downscales large images itself anyway.
+MAX_IMAGE_WIDTH = 2048
+
 # LLM SPECIFIC SECTION: Below are constants that are specific to the LLM you are using
 
 # The model you are using, to calculate how many tokens the current message is
@@ -85,6 +88,14 @@ BANNED_TOKENS = ""
 # List of stopping strings. Necessary for Llama 3
 STOP_STRINGS = ["\n", "<|eot_id|>"]
 
+# When the prompt overflows, the oldest messages are folded into a running summary this many messages at a time
+SUMMARY_CHUNK_SIZE = 10
+
+# Maximum length of the running summary of dropped messages
+SUMMARY_MAX_TOKENS = 150
+
+SUMMARY_PROMPT = "\nSummarize the conversation above in a few sentences. Keep names, facts and anything that was promised. Only output the summary, no explanations."
+
 # MEMORY SECTION: Constants relevant to forming new memories
 
 MEMORY_PROMPT = "\nGiven only the information above, what are 3 most salient high level questions we can answer about the subjects in the conversation? Separate each question and answer pair with \"{qa}\", and only output the question and answer, no explanations."
@@ -0,0 +1,6 @@
+# Token counts derived from constants.py, computed once at import.
+# Kept separate from constants.py so the config can be imported without tiktoken.
+from constants import MODEL, SYSTEM_PROMPT
+from llmWrappers.abstractLLMWrapper import get_encoding
+
+SYSTEM_PROMPT_TOKENS = len(get_encoding(MODEL).encode_ordinary(SYSTEM_PROMPT))
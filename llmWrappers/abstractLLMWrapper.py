@@ -1,15 +1,66 @@
-import copy
+import re
+import hashlib
 import requests
-import sseclient
-import json
+import orjson
 import time
 import os
+import threading
+import tiktoken
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from dotenv import load_dotenv
 from constants import *
 from modules.injection import Injection
 
 
+# Loading a BPE encoding is expensive, so share a single instance per model across all wrappers
+@lru_cache(maxsize=None)
+def get_encoding(model):
+    return tiktoken.encoding_for_model(model)
+
+
+# .env is only parsed once per process, every wrapper shares the resulting headers
+@lru_cache(maxsize=None)
+def get_base_headers():
+    load_dotenv()  # 환경변수 다시 로드
+    api_key = os.getenv('OPENAI_API_KEY')
+    print(f"DEBUG: API Key loaded: {api_key[:10]}..." if api_key else "DEBUG: API Key is None")
+
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+
+
+TOOL_TRIGGER_RE = re.compile(r'\[TOOL_TRIGGER:(.*?)\]')
+
+# Shared by every wrapper so prompts reuse the keep-alive connection instead of a new TLS handshake each time
+SESSION = requests.Session()
+
+# Opens the connection to the API in the background while a prompt is being assembled
+_WARMUP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LLM-Warmup")
+
+# A pooled connection used within this many seconds is assumed to still be open, no warm-up needed
+KEEPALIVE_SECONDS = 15.0
+
+# Summaries of pruned history shared by every wrapper, keyed by the previous summary and the messages it folds in.
+# The lock is held while a summary is requested so two wrappers never request the same one
+SUMMARY_CACHE_SIZE = 64
+_summary_cache = OrderedDict()
+_summary_lock = threading.Lock()
+
+
+def warm_connection():
+    try:
+        SESSION.head("https://api.openai.com/v1/", timeout=(5, 5)).close()
+    except requests.RequestException:
+        pass
+
+
 class AbstractLLMWrapper:
+    # Monotonic time of the last request on SESSION, shared by every wrapper
+    _last_request = 0.0
 
     def __init__(self, signals, tts, llmState, modules=None):
         self.signals = signals
@@ -21,42 +72,40 @@ class AbstractLLMWrapper:
         else:
             self.modules = modules
 
-        load_dotenv()  # 환경변수 다시 로드
-        api_key = os.getenv('OPENAI_API_KEY')
-        print(f"DEBUG: API Key loaded: {api_key[:10]}..." if api_key else "DEBUG: API Key is None")
-        
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
+        # Shared between all wrappers, replace instead of mutating it
+        self.headers = get_base_headers()
+
+        # Tool LLM turns this off so its prompts and output stay out of the history
+        self.save_to_history = True
 
         #Below constants must be set by child classes
         self.SYSTEM_PROMPT = None
         self.LLM_ENDPOINT = None
         self.CONTEXT_SIZE = None
         self.tokenizer = None
+        self._sys_tokens = 0
+
+        # Formatted tool result context and its token count, keyed by a SHA-256 of the tool results
+        self._tool_context_cache = OrderedDict()
 
     # Basic filter to check if a message contains a word in the blacklist
     def is_filtered(self, text):
         # Filter messages with words in blacklist
-        if any(bad_word.lower() in text.lower().split() for bad_word in self.llmState.blacklist):
-            return True
-        else:
-            return False
+        return not self.llmState.blacklist_words.isdisjoint(text.lower().split())
 
-    # Assembles all the injections from all modules into a single prompt by increasing priority
-    def assemble_injections(self, injections=None):
-        if injections is None:
-            injections = []
-
-        # Gather all injections from all modules
-        for module in self.modules.values():
-            injections.append(module.get_prompt_injection())
+    # Gathers the injections from all modules, empty injections and ones with negative priority are left out
+    def gather_injections(self):
+        injections = [module.get_prompt_injection() for module in self.modules.values()]
+        injections = [injection for injection in injections if injection.priority >= 0 and injection.text]
 
         # Let all modules clean up once the prompt injection has been fetched from all modules
         for module in self.modules.values():
             module.cleanup()
 
+        return injections
+
+    # Assembles injections into a single prompt by increasing priority
+    def assemble_injections(self, injections):
         # Sort injections by priority
         injections = sorted(injections, key=lambda x: x.priority)
 
@@ -66,6 +115,19 @@ class AbstractLLMWrapper:
             prompt += injection.text
         return prompt
 
+    def count_tokens(self, text):
+        return len(self.tokenizer.encode_ordinary(text))
+
+    # Prefix a message with the speaker name, blank messages are left out of the prompt
+    def format_message(self, message):
+        if message["content"] == "":
+            return ""
+        if message["role"] == "user":
+            return HOST_NAME + ": " + message["content"] + "\n"
+        elif message["role"] == "assistant":
+            return AI_NAME + ": " + message["content"] + "\n"
+        return message["content"]
+
     def _process_tool_results_naturally(self, tool_results):
         """Tool 결과를 자연스러운 컨텍스트 정보로 변환"""
         context_parts = []
@@ -106,58 +168,159 @@ class AbstractLLMWrapper:
         
         return None
 
-    def generate_prompt(self):
-        messages = copy.deepcopy(self.signals.history)
-
-        # For every message prefix with speaker name unless it is blank
-        for message in messages:
-            if message["role"] == "user" and message["content"] != "":
-                message["content"] = HOST_NAME + ": " + message["content"] + "\n"
-            elif message["role"] == "assistant" and message["content"] != "":
-                message["content"] = AI_NAME + ": " + message["content"] + "\n"
-
-        while True:
-            chat_section = ""
-            for message in messages:
-                chat_section += message["content"]
-
-            generation_prompt = AI_NAME + ": "
-
-            # Add tool results if available
-            tool_injections = []
-            if hasattr(self.signals, 'tool_results') and self.signals.tool_results:
-                context_info = self._process_tool_results_naturally(self.signals.tool_results)
-                if context_info:
-                    tool_injections = [Injection(context_info, 30)]  # Between system prompt and message history
-
-            # Store tool injections separately to exclude from memory
-            self.temp_tool_injections = tool_injections
-            base_injections = [Injection(self.SYSTEM_PROMPT, 10)] + tool_injections + [Injection(chat_section, 100)]
-            
-            # Clear tool results after using them to prevent accumulation
-            if hasattr(self.signals, 'tool_results'):
-                self.signals.tool_results = []
-            full_prompt = self.assemble_injections(base_injections) + generation_prompt
-            wrapper = [{"role": "user", "content": full_prompt}]
+    # Cached wrapper around _process_tool_results_naturally, returns the context text and its token count
+    def tool_results_context(self, tool_results):
+        key = hashlib.sha256(orjson.dumps(tool_results, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                                          default=str)).digest()
+        if key in self._tool_context_cache:
+            self._tool_context_cache.move_to_end(key)
+            return self._tool_context_cache[key]
+
+        context_info = self._process_tool_results_naturally(tool_results)
+        entry = (context_info, self.count_tokens(context_info) if context_info else 0)
+        self._tool_context_cache[key] = entry
+        if len(self._tool_context_cache) > 128:
+            self._tool_context_cache.popitem(last=False)
+        return entry
+
+    # Token counts are cached on the history entries themselves, so each message is only encoded once.
+    # Uncached messages (e.g. on cold start) are encoded together so tiktoken can spread them across cores
+    def cache_message_tokens(self, messages):
+        uncached = [message for message in messages if "_tok" not in message]
+        if uncached:
+            encoded = self.tokenizer.encode_ordinary_batch([self.format_message(message) for message in uncached],
+                                                           num_threads=os.cpu_count() or 1)
+            for message, tokens in zip(uncached, encoded):
+                message["_tok"] = len(tokens)
 
+    def generate_prompt(self):
+        # Shallow copy only: the entries are shared with signals.history and are annotated in place
+        # with their cached token count ("_tok") by cache_message_tokens below
+        messages = list(self.signals.history)
+
+        generation_prompt = AI_NAME + ": "
+
+        # Add tool results if available
+        tool_injections = []
+        tool_tokens = 0
+        if self.signals.tool_results:
+            context_info, tool_tokens = self.tool_results_context(self.signals.tool_results)
+            if context_info:
+                tool_injections = [Injection(context_info, 30)]  # Between system prompt and message history
+
+        # Store tool injections separately to exclude from memory
+        self.temp_tool_injections = tool_injections
+
+        # Clear tool results after using them to prevent accumulation
+        self.signals.tool_results = []
+        module_injections = self.gather_injections()
+        injections = tool_injections + module_injections
+
+        # Upper bound on the prompt size: every token covers at least one UTF-8 byte, so the byte length
+        # never undercounts (Korean is ~3 bytes per character), and messages with a cached count use it.
+        # Only tokenize exactly when the bound reaches the limit
+        prefix_bytes = max(len(HOST_NAME.encode()), len(AI_NAME.encode())) + 3
+        upper_bound = self._sys_tokens + tool_tokens + len(generation_prompt.encode())
+        upper_bound += sum(len(injection.text.encode()) for injection in module_injections)
+        upper_bound += sum(message["_tok"] if "_tok" in message else len(message["content"].encode()) + prefix_bytes
+                           for message in messages)
+        if upper_bound < 0.9 * self.CONTEXT_SIZE:
+            prompt_tokens = 0
+        else:
             # Find out roughly how many tokens the prompt is
             # Not 100% accurate, but it should be a good enough estimate
-            prompt_tokens = len(self.tokenizer.encode(full_prompt))
-            # print(prompt_tokens)
-
-            # Maximum 90% context size usage before prompting LLM
-            if prompt_tokens < 0.9 * self.CONTEXT_SIZE:
-                self.signals.sio_queue.put(("full_prompt", full_prompt))
-                # print(full_prompt)
-                return full_prompt
-            else:
+            self.cache_message_tokens(messages)
+            prompt_tokens = self._sys_tokens + tool_tokens + self.count_tokens(generation_prompt)
+            prompt_tokens += sum(self.count_tokens(injection.text) for injection in module_injections)
+            prompt_tokens += sum(message["_tok"] for message in messages)
+
+        # Maximum 90% context size usage before prompting LLM
+        if prompt_tokens >= 0.9 * self.CONTEXT_SIZE:
+            # Leave room for the summary, then drop the oldest messages a whole chunk at a time.
+            # Chunks line up with the start of the history so the running summary can be reused on later prompts
+            prompt_tokens += SUMMARY_MAX_TOKENS + self.count_tokens(self.format_summary(""))
+            pruned = 0
+            while prompt_tokens >= 0.9 * self.CONTEXT_SIZE:
                 # If the prompt is too long even with no messages, there's nothing we can do, crash
-                if len(messages) < 1:
+                if pruned >= len(messages):
                     raise RuntimeError("Prompt too long even with no messages")
 
-                # Remove the oldest message from the prompt and try again
-                messages.pop(0)
-                print("Prompt too long, removing earliest message")
+                chunk = messages[pruned:pruned + SUMMARY_CHUNK_SIZE]
+                prompt_tokens -= sum(message["_tok"] for message in chunk)
+                pruned += len(chunk)
+            print(f"Prompt too long, summarizing the earliest {pruned} messages")
+
+            summary = self.summarize_history(messages[:pruned])
+            if summary:
+                injections.append(Injection(self.format_summary(summary), 50))
+            messages = messages[pruned:]
+
+        # For every message prefix with speaker name unless it is blank
+        chat_section = "".join(map(self.format_message, messages))
+
+        if injections:
+            base_injections = [Injection(self.SYSTEM_PROMPT, 10)] + injections + [Injection(chat_section, 100)]
+            full_prompt = self.assemble_injections(base_injections) + generation_prompt
+        else:
+            # Nothing to sort when there are no module or tool injections
+            full_prompt = self.SYSTEM_PROMPT + chat_section + generation_prompt
+
+        self.signals.sio_queue.put(("full_prompt", full_prompt))
+        # print(full_prompt)
+        return full_prompt
+
+    def format_summary(self, summary):
+        return "Summary of the earlier conversation:\n" + summary + "\n"
+
+    # Folds the pruned messages into a running summary. The summary is stored on the last message it covers
+    # ("_summary"), so only messages pruned since the previous prompt are sent to be summarized
+    def summarize_history(self, messages):
+        start = len(messages)
+        while start > 0 and "_summary" not in messages[start - 1]:
+            start -= 1
+        summary = messages[start - 1]["_summary"] if start else ""
+        if start == len(messages):
+            return summary
+
+        chunk = "".join(map(self.format_message, messages[start:]))
+        key = hash((summary, chunk))
+        with _summary_lock:
+            new_summary = _summary_cache.get(key)
+            if new_summary is None:
+                new_summary = self.request_summary(summary, chunk)
+                # Keep whatever was summarized so far, the new messages are simply left out
+                if new_summary is None:
+                    return summary
+                _summary_cache[key] = new_summary
+                if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+                    _summary_cache.popitem(last=False)
+            else:
+                _summary_cache.move_to_end(key)
+
+        messages[-1]["_summary"] = new_summary
+        return new_summary
+
+    def request_summary(self, summary, chat_section):
+        if summary:
+            chat_section = self.format_summary(summary) + chat_section
+
+        data = {
+            "model": MODEL,
+            "max_tokens": SUMMARY_MAX_TOKENS,
+            "messages": [{
+                "role": "user",
+                "content": chat_section + SUMMARY_PROMPT
+            }]
+        }
+
+        try:
+            response = SESSION.post("https://api.openai.com/v1/chat/completions", headers=self.headers, json=data,
+                                    timeout=(5, 30))
+            AbstractLLMWrapper._last_request = time.monotonic()
+            return response.json()['choices'][0]['message']['content'].strip()
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            print(f"DEBUG: Failed to summarize history: {e}")
+            return None
 
     def prepare_payload(self):
         raise NotImplementedError("Must implement prepare_payload in child classes")
@@ -167,62 +330,77 @@ class AbstractLLMWrapper:
             return
 
         # Text/Image LLM 상태 설정 (Tool LLM은 별도 처리)
-        if getattr(self, 'save_to_history', True):
-            self.signals.text_llm_thinking = True
-        
-        self.signals.new_message = False
+        if self.save_to_history:
+            self.signals.batch_update(text_llm_thinking=True, new_message=False)
+        else:
+            self.signals.new_message = False
         self.signals.sio_queue.put(("reset_next_message", None))
 
+        # Overlap the TCP/TLS handshake with prompt assembly (memory lookup, tokenization, screenshots),
+        # unless a recent request left a pooled connection open. Not awaited: if the payload is ready
+        # first the POST just opens its own connection instead of waiting on the probe
+        if time.monotonic() - AbstractLLMWrapper._last_request >= KEEPALIVE_SECONDS:
+            _WARMUP_EXECUTOR.submit(warm_connection)
         data = self.prepare_payload()
         print(f"DEBUG: Sending request to OpenAI API...")
         print(f"DEBUG: Headers: {self.headers}")
         print(f"DEBUG: Payload: {data}")
 
         try:
-            stream_response = requests.post("https://api.openai.com/v1/chat/completions", headers=self.headers, json=data,
-                                            stream=True)
+            # Wrappers may hand over an already serialized payload
+            body = data if isinstance(data, bytes) else orjson.dumps(data)
+            stream_response = SESSION.post("https://api.openai.com/v1/chat/completions", headers=self.headers, data=body,
+                                           stream=True, timeout=(5, 60))
             print(f"DEBUG: Response status: {stream_response.status_code}")
             
             if stream_response.status_code != 200:
                 print(f"DEBUG: Response text: {stream_response.text}")
                 self.signals.AI_thinking = False
                 return
-                
-            response_stream = sseclient.SSEClient(stream_response)
         except Exception as e:
             print(f"DEBUG: Request failed: {e}")
             self.signals.AI_thinking = False
             return
 
-        AI_message = ''
-        for event in response_stream.events():
+        # Collect chunks in a list and join once, repeated string concatenation is quadratic on long responses
+        chunks = []
+        append = chunks.append
+        loads = orjson.loads
+        for line in stream_response.iter_lines():
             # Check to see if next message was canceled
             if self.llmState.next_cancelled:
                 continue
-                
-            # Skip data: [DONE] messages
-            if event.data == '[DONE]':
+
+            # Only data lines carry events, skip blank separators and comments
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].lstrip()
+            # Only JSON objects carry content, skip data: [DONE] and keepalives without parsing them.
+            # The stream is still read to the end so the connection goes back to the session's pool
+            if not data.startswith(b"{"):
                 continue
 
             try:
-                payload = json.loads(event.data)
-# Debug logging disabled
-                
+                payload = loads(data)
+
                 # OpenAI API structure: check if delta and content exist
-                if 'choices' in payload and len(payload['choices']) > 0:
-                    delta = payload['choices'][0].get('delta', {})
-                    chunk = delta.get('content', '')
-                    
+                choices = payload.get('choices')
+                if choices:
+                    chunk = choices[0].get('delta', {}).get('content')
+
                     if chunk:  # Only add non-empty chunks
-                        AI_message += chunk
+                        append(chunk)
                         # 실시간 전송 제거 - 최종 답변만 전송
-                        
-            except (json.JSONDecodeError, KeyError, IndexError) as e:
-                # Skip empty or malformed data without printing debug message
-                if event.data.strip() and event.data != "[DONE]":
-                    print(f"DEBUG: Error parsing event data: {e}")
+
+            except (orjson.JSONDecodeError, AttributeError, IndexError) as e:
+                # Skip malformed data
+                print(f"DEBUG: Error parsing event data: {e}")
                 continue
 
+        AI_message = "".join(chunks)
+        # The stream was read to the end, so its connection is back in the pool and still warm
+        AbstractLLMWrapper._last_request = time.monotonic()
+
         if self.llmState.next_cancelled:
             self.llmState.next_cancelled = False
             self.signals.sio_queue.put(("reset_next_message", None))
@@ -231,16 +409,15 @@ class AbstractLLMWrapper:
 
         # Check for TOOL_TRIGGER token in response FIRST (before any output)
         tool_triggered = False
-        if getattr(self, 'save_to_history', True) and '[TOOL_TRIGGER:' in AI_message:
-            import re
+        if self.save_to_history and '[TOOL_TRIGGER:' in AI_message:
             # Extract tool trigger request
-            match = re.search(r'\[TOOL_TRIGGER:(.*?)\]', AI_message)
+            match = TOOL_TRIGGER_RE.search(AI_message)
             if match:
                 tool_request = match.group(1).strip()
                 print(f"[TEXT LLM] Tool trigger detected: {tool_request}")
                 
                 # Remove the trigger token from the displayed message
-                AI_message = re.sub(r'\[TOOL_TRIGGER:.*?\]', '', AI_message).strip()
+                AI_message = TOOL_TRIGGER_RE.sub('', AI_message).strip()
                 tool_triggered = True
                 
                 # Set signals for toolLLM
@@ -248,23 +425,24 @@ class AbstractLLMWrapper:
                 self.signals.tool_execution_needed = True
 
         print("AI OUTPUT: " + AI_message)
-        self.signals.last_message_time = time.time()
-        self.signals.AI_speaking = True
+        self.signals.last_message_time = time.monotonic()
         
-        # Text/Image LLM thinking 종료
-        if getattr(self, 'save_to_history', True):
-            self.signals.text_llm_thinking = False
+        # 말하기 시작과 Text/Image LLM thinking 종료를 한 번에 전송
+        if self.save_to_history:
+            self.signals.batch_update(AI_speaking=True, text_llm_thinking=False)
+        else:
+            self.signals.AI_speaking = True
 
         if self.is_filtered(AI_message):
             AI_message = "Filtered."
             self.signals.sio_queue.put(("reset_next_message", None))
 
         # Only save to history if not explicitly disabled (for Tool LLM) - save clean message
-        if getattr(self, 'save_to_history', True):
+        if self.save_to_history:
             self.signals.history.append({"role": "assistant", "content": AI_message})
         
         # Send clean message to WebSocket server (without TOOL_TRIGGER tokens)
-        if hasattr(self.signals, 'ws_server') and self.signals.ws_server:
+        if self.signals.ws_server:
             self.signals.ws_server.send_ai_response_sync(AI_message)
         
         self.tts.play(AI_message)
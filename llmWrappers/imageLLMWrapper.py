@@ -1,9 +1,23 @@
 import os
-import mss, cv2, base64
+import threading
+import mss, cv2
 import numpy as np
-import tiktoken
+try:
+    # SIMD accelerated base64, falls back to the standard library when not installed
+    from pybase64 import b64encode_as_string
+except ImportError:
+    import base64
+
+    def b64encode_as_string(data):
+        return base64.b64encode(data).decode("ascii")
+from concurrent.futures import ThreadPoolExecutor
 from constants import *
-from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper
+from constants_tokens import SYSTEM_PROMPT_TOKENS
+from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper, get_encoding
+
+
+# Screenshots are captured and encoded here while the prompt is being generated
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ImageLLM-Screenshot")
 
 
 class ImageLLMWrapper(AbstractLLMWrapper):
@@ -13,7 +27,8 @@ class ImageLLMWrapper(AbstractLLMWrapper):
         self.SYSTEM_PROMPT = SYSTEM_PROMPT
         self.LLM_ENDPOINT = MULTIMODAL_ENDPOINT
         self.CONTEXT_SIZE = MULTIMODAL_CONTEXT_SIZE
-        self.tokenizer = tiktoken.encoding_for_model(MODEL)
+        self.tokenizer = get_encoding(MODEL)
+        self._sys_tokens = SYSTEM_PROMPT_TOKENS
 
         # Use separate API key for image LLM
         self.image_api_key = os.environ.get('OPENAI_IMAGE_API_KEY', os.environ.get('OPENAI_API_KEY'))
@@ -22,25 +37,36 @@ class ImageLLMWrapper(AbstractLLMWrapper):
             "Content-Type": "application/json"
         }
 
-        self.MSS = None
+        # MSS instances can't be shared between threads, so keep one per thread
+        self.MSS = threading.local()
 
     def screen_shot(self):
-        # Create new MSS instance for each call to avoid thread issues
-        local_mss = mss.mss()
-        
+        local_mss = getattr(self.MSS, "instance", None)
+        if local_mss is None:
+            local_mss = self.MSS.instance = mss.mss()
+
         # Take a screenshot of the main screen
         frame_bytes = local_mss.grab(local_mss.monitors[PRIMARY_MONITOR])
 
-        frame_array = np.array(frame_bytes)
-        # resize
-        frame_resized = cv2.resize(frame_array, (1920, 1080), interpolation=cv2.INTER_CUBIC)
-        encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 95]
-        result, frame_encoded = cv2.imencode('.jpg', frame_resized, encode_param)
+        # View the BGRA capture buffer without copying it, then drop the alpha channel for encoding
+        frame_bgra = np.frombuffer(frame_bytes.raw, dtype=np.uint8).reshape(frame_bytes.height, frame_bytes.width, 4)
+        frame_array = cv2.cvtColor(frame_bgra, cv2.COLOR_BGRA2BGR)
+        # The API downscales images itself, so only resize frames wider than it will ever use
+        height, width = frame_array.shape[:2]
+        if width > MAX_IMAGE_WIDTH:
+            frame_array = cv2.resize(frame_array, (MAX_IMAGE_WIDTH, height * MAX_IMAGE_WIDTH // width),
+                                     interpolation=cv2.INTER_AREA)
+        encode_param = [int(cv2.IMWRITE_WEBP_QUALITY), 80]
+        result, frame_encoded = cv2.imencode('.webp', frame_array, encode_param)
         # base64
-        frame_base64 = base64.b64encode(frame_encoded).decode("utf-8")
+        frame_base64 = b64encode_as_string(frame_encoded.tobytes())
         return frame_base64
 
     def prepare_payload(self):
+        # Capture the screen in the background while the prompt is assembled
+        screenshot = _EXECUTOR.submit(self.screen_shot)
+        prompt = self.generate_prompt()
+
         return {
             "model": "gpt-4o-mini",
             "messages": [{
@@ -48,12 +74,12 @@ class ImageLLMWrapper(AbstractLLMWrapper):
                 "content": [
                     {
                         "type": "text",
-                        "text": self.generate_prompt()
+                        "text": prompt
                     },
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{self.screen_shot()}"
+                            "url": f"data:image/webp;base64,{screenshot.result()}"
                         }
                     }
                 ]
@@ -5,4 +5,14 @@ class LLMState:
 
         # Read in blacklist from file
         with open('blacklist.txt', 'r') as file:
-            self.blacklist = file.read().splitlines()
\ No newline at end of file
+            self.blacklist = file.read().splitlines()
+
+    @property
+    def blacklist(self):
+        return self._blacklist
+
+    # Keep a lowercased set of the blacklist so filtering is a single pass over the text
+    @blacklist.setter
+    def blacklist(self, value):
+        self._blacklist = value
+        self.blacklist_words = frozenset(word.lower() for word in value)
@@ -1,7 +1,8 @@
 import os
-import tiktoken
+import orjson
 from constants import *
-from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper
+from constants_tokens import SYSTEM_PROMPT_TOKENS
+from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper, get_encoding
 
 
 class TextLLMWrapper(AbstractLLMWrapper):
@@ -11,16 +12,17 @@ class TextLLMWrapper(AbstractLLMWrapper):
         self.SYSTEM_PROMPT = SYSTEM_PROMPT
         self.LLM_ENDPOINT = LLM_ENDPOINT
         self.CONTEXT_SIZE = CONTEXT_SIZE
-        self.tokenizer = tiktoken.encoding_for_model(MODEL)
+        self.tokenizer = get_encoding(MODEL)
+        self._sys_tokens = SYSTEM_PROMPT_TOKENS
 
-    def prepare_payload(self):
-        return {
+        # Everything but the prompt is static, so serialize it once without the closing brace and splice the prompt in
+        self._payload_prefix = orjson.dumps({
             "model": MODEL,
-            "messages": [{
-                "role": "user",
-                "content": self.generate_prompt()
-            }],
             "max_tokens": 200,
             "stream": True,
             "stop": STOP_STRINGS
-        }
\ No newline at end of file
+        })[:-1]
+
+    def prepare_payload(self):
+        return (self._payload_prefix + b',"messages":[{"role":"user","content":'
+                + orjson.dumps(self.generate_prompt()) + b'}]}')
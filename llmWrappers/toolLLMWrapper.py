@@ -1,27 +1,97 @@
 import os
-import json
-import requests
-import sseclient
-import tiktoken
+import sys
+import queue
+import logging
+import logging.handlers
+import ssl
+import orjson
+import aiohttp
 import asyncio
+import threading
+import time
+import hashlib
+from collections import OrderedDict
+from typing import AsyncIterator
 from constants import *
 from llmWrappers.abstractLLMWrapper import AbstractLLMWrapper
+from llmWrappers.toolPrompt import format_tool_prompt
 
 # Dynamic Tool System Integration
 from tools.neuro_dynamic_system import NeuroDynamicSystem, initialize_neuro_dynamic_system
 from tools.dynamic_tool_manager import ToolSelectionContext, SelectionStrategy
 from tools.failure_handler import handle_tool_failure
 
+# Log records are formatted and written by a listener thread, off the tool loop
+logger = logging.getLogger("toolllm")
+logger.setLevel(os.environ.get('TOOL_LLM_LOG_LEVEL', 'INFO').upper())
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("[TOOL LLM] %(message)s"))
+logging.handlers.QueueListener(_log_queue, _log_handler).start()
+
+def _parse_delta(frame):
+    """Return choices[0].delta of a chat.completion.chunk, decoding only the delta object when possible"""
+    # Slice up to the choice key that follows the delta. A quote inside a JSON string is always escaped,
+    # so the terminator can't match inside content or arguments; it can still match a key nested in the
+    # delta, but then the slice is an unclosed object, fails to decode and falls back to a full parse
+    start = frame.find(b'"delta":')
+    if start != -1:
+        start += 8
+        for terminator in (b',"logprobs"', b',"finish_reason"'):
+            end = frame.find(terminator, start)
+            if end != -1:
+                try:
+                    return orjson.loads(frame[start:end])
+                except orjson.JSONDecodeError:
+                    break
+    choices = orjson.loads(frame).get('choices')
+    return choices[0].get('delta', {}) if choices else None
+
+async def _iter_sse_data(content: aiohttp.StreamReader) -> AsyncIterator[bytes]:
+    """Yield the data payload of each SSE frame read from an aiohttp stream"""
+    buf = bytearray()
+    async for chunk in content.iter_chunked(16384):
+        buf += chunk
+        while (i := buf.find(b"\n\n")) != -1:
+            frame = bytes(buf[:i])
+            del buf[:i + 2]
+            for line in frame.splitlines():
+                if line.startswith(b"data:"):
+                    data = line[5:].lstrip()
+                    # Keep reading past [DONE] so the connection goes back to the pool
+                    if data != b"[DONE]":
+                        yield data
+
+def _serialize_tool_result(raw):
+    """Scalars as plain text, everything else as JSON (not Python repr) for the next LLM call"""
+    if isinstance(raw, str):
+        return raw
+    if raw is None or isinstance(raw, (int, float, bool)):
+        return str(raw)
+    return orjson.dumps(raw, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
+
+# Tool LLM 코루틴은 모두 이 루프 하나에서 돈다 (aiohttp 세션도 이 루프에 묶임)
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, daemon=True, name="ToolLLM-Loop").start()
+
 
 class ToolLLMWrapper(AbstractLLMWrapper):
     """Tool LLM that doesn't save its prompts to history"""
 
+    # Shared across calls so keep-alive connections are reused
+    _session = None
+    _last_request = 0.0
+    # How long idle pooled connections are kept
+    _KEEPALIVE_SECONDS = 15.0
+
     def __init__(self, signals, tts, llmState, modules=None):
         super().__init__(signals, tts, llmState, modules)
         self.SYSTEM_PROMPT = SYSTEM_PROMPT
         self.LLM_ENDPOINT = LLM_ENDPOINT
         self.CONTEXT_SIZE = CONTEXT_SIZE
-        self.tokenizer = tiktoken.encoding_for_model(MODEL)
+        # No tokenizer: the tool prompt is fixed-size and never pruned
         
         # Use separate API key for tool LLM
         self.tool_api_key = os.environ.get('OPENAI_TOOL_API_KEY', os.environ.get('OPENAI_API_KEY'))
@@ -33,10 +103,32 @@ class ToolLLMWrapper(AbstractLLMWrapper):
         # Initialize Dynamic Tool System
         self.dynamic_system = initialize_neuro_dynamic_system(signals=signals)
         self._is_dynamic_system_ready = False
-        
+        self._init_task = None
+        self._last_error = None
+        # Background connection warm-up started by _async_prompt
+        self._warmup_task = None
+
+        # OpenAI tool descriptors by tool name, and serialized tools arrays by selection
+        self._tool_spec_cache = {}
+        self._tools_json_cache = {}
+        # Static request fields, without the closing brace
+        self._payload_prefix = orjson.dumps({
+            "model": MODEL,
+            "max_tokens": 200,
+            "stream": True,
+            "stop": STOP_STRINGS,
+            "tool_choice": "auto"
+        })[:-1]
+
+        # Selected tools by normalized request, so repeated triggers skip the embedding query
+        self._select_cache = OrderedDict()
+
         # Flag to prevent history saving
         self.save_to_history = False
 
+        # Load the tool catalog in the background instead of on the first tool call
+        asyncio.run_coroutine_threadsafe(self._ensure_dynamic_system_ready(), _LOOP)
+
     async def get_dynamic_tools_for_context(self, user_input: str):
         """Get dynamic tools based on user input context"""
         if not self._is_dynamic_system_ready:
@@ -46,28 +138,36 @@ class ToolLLMWrapper(AbstractLLMWrapper):
             # Create selection context
             context = ToolSelectionContext(
                 user_input=user_input,
-                conversation_history=self.signals.history[-5:] if hasattr(self.signals, 'history') else [],
+                conversation_history=self.signals.history[-5:],
                 max_tools=6,
                 strategy=SelectionStrategy.HYBRID
             )
             
-            # Get relevant tools
-            selected_tools = await self.dynamic_system.tool_manager.select_relevant_tools(context)
+            # Get relevant tools (cached per registry version and normalized request)
+            key = (self.dynamic_system.registry.version,
+                   hashlib.blake2b(user_input.lower().strip().encode(), digest_size=16).digest())
+            selected_tools = self._select_cache.get(key)
+            if selected_tools is None:
+                selected_tools = await self.dynamic_system.tool_manager.select_relevant_tools(context)
+                self._select_cache[key] = selected_tools
+                if len(self._select_cache) > 256:
+                    self._select_cache.popitem(last=False)
+            else:
+                self._select_cache.move_to_end(key)
             
-            # Convert to OpenAI function format
-            openai_tools = []
-            for tool in selected_tools:
-                spec = tool.get_spec()
-                openai_tools.append({
-                    "type": "function",
-                    "function": spec
-                })
+            # Convert to OpenAI function format (specs are static per tool)
+            cache = self._tool_spec_cache
+            openai_tools = [
+                cache.get(tool.metadata.name) or cache.setdefault(
+                    tool.metadata.name, {"type": "function", "function": dict(tool.get_spec())})
+                for tool in selected_tools
+            ]
             
-            print(f"[TOOL LLM] Selected {len(openai_tools)} dynamic tools for context: {user_input[:50]}...")
+            logger.info("Selected %d dynamic tools for context: %.50s...", len(openai_tools), user_input)
             return openai_tools
             
         except Exception as e:
-            print(f"[TOOL LLM] Error getting dynamic tools: {e}")
+            logger.error("Error getting dynamic tools: %s", e)
             return self._get_fallback_tools()
     
     def _get_fallback_tools(self):
@@ -87,159 +187,126 @@ class ToolLLMWrapper(AbstractLLMWrapper):
             }
         ]
 
-    async def prepare_payload(self):
+    def _resolve_context(self):
+        """Tool request as context, fallback to recent user input"""
+        if self.signals.tool_trigger_request:
+            return self.signals.tool_trigger_request
+        for msg in reversed(self.signals.history):
+            if msg["role"] == "user":
+                return msg["content"]
+        return ""
+
+    async def prepare_payload(self, context_for_tools=None):
         # Get dynamic tools based on tool request context
-        tool_request = getattr(self.signals, 'tool_trigger_request', '')
-        
-        # Use tool request as context, fallback to recent user input
-        context_for_tools = tool_request
-        if not context_for_tools and hasattr(self.signals, 'history') and self.signals.history:
-            for msg in reversed(self.signals.history):
-                if msg["role"] == "user":
-                    context_for_tools = msg["content"]
-                    break
+        if context_for_tools is None:
+            context_for_tools = self._resolve_context()
         
         dynamic_tools = await self.get_dynamic_tools_for_context(context_for_tools)
-        
-        return {
-            "model": MODEL,
-            "messages": [{
-                "role": "user",
-                "content": self.generate_tool_prompt()
-            }],
-            "max_tokens": 200,
-            "stream": True,
-            "stop": STOP_STRINGS,
-            "tools": dynamic_tools,
-            "tool_choice": "auto"
-        }
+        tool_names = tuple(tool['function']['name'] for tool in dynamic_tools)
+        tools_json = self._tools_json_cache.get(tool_names)
+        if tools_json is None:
+            tools_json = self._tools_json_cache.setdefault(tool_names, orjson.dumps(dynamic_tools))
+
+        prompt = self.generate_tool_prompt()
+
+        # Log the prompt being sent to Tool LLM
+        logger.debug("Prompt content: %.500s", prompt)
+        logger.info("Available tools: %s", tool_names)
+
+        # Only the prompt is encoded per call; the static fields and tools array are pre-serialized
+        return (self._payload_prefix + b',"messages":[{"role":"user","content":' + orjson.dumps(prompt)
+                + b'}],"tools":' + tools_json + b'}')
 
     def generate_tool_prompt(self):
         """Generate specialized prompt for executing tools based on tool trigger request"""
         
         # Get the specific tool request from the trigger
-        tool_request = getattr(self.signals, 'tool_trigger_request', '')
-        
-        # Get recent conversation context (in chronological order)
-        recent_messages = []
-        if hasattr(self.signals, 'history') and self.signals.history:
-            # Get last 4 messages in chronological order (not reversed)
-            for msg in self.signals.history[-4:]:
-                if msg["role"] == "user" and msg["content"].strip():
-                    recent_messages.append(f"User: {msg['content']}")
-                elif msg["role"] == "assistant" and msg["content"].strip():
-                    # Clean any TOOL_TRIGGER tokens from display
-                    clean_content = msg['content']
-                    if '[TOOL_TRIGGER:' in clean_content:
-                        import re
-                        clean_content = re.sub(r'\[TOOL_TRIGGER:.*?\]', '', clean_content).strip()
-                    recent_messages.append(f"Luna: {clean_content}")
-        
-        conversation_context = "\n".join(recent_messages) if recent_messages else "No recent conversation"
-        
-        tool_prompt = f"""You are a tool execution assistant. Luna has requested tool execution with a specific request.
-
-RECENT CONVERSATION:
-{conversation_context}
-
-TOOL REQUEST: "{tool_request}"
-
-YOUR TASK:
-Analyze the tool request and execute the appropriate tools to fulfill it. The request describes what the user needs.
-
-INSTRUCTIONS:
-1. Understand what "{tool_request}" is asking for
-2. Select and execute the most appropriate tools available to fulfill this request
-3. If the request is clear and specific, execute the relevant tools
-4. If the request is too vague or no tools are needed, respond "NO_TOOLS_NEEDED"
-
-EXAMPLES:
-- Request: "get current weather" → Execute weather tool
-- Request: "search for minecraft tutorials" → Execute search/web tool  
-- Request: "calculate complex math problem" → Execute calculator/math tool
-- Request: "find information about AI news" → Execute search/news tool
-- Request: "play music" → Execute audio/music tool
-- Request: "take a screenshot" → Execute screen capture tool
-
-Execute the appropriate tools based on the request: "{tool_request}" """
-
-        return tool_prompt
+        return format_tool_prompt(self.signals.history[-4:], self.signals.tool_trigger_request)
 
     async def _ensure_dynamic_system_ready(self):
         """Ensure dynamic tool system is initialized"""
-        if not self._is_dynamic_system_ready:
-            try:
-                await self.dynamic_system.initialize()
-                self._is_dynamic_system_ready = True
-                print("[TOOL LLM] Dynamic tool system initialized")
-            except Exception as e:
-                print(f"[TOOL LLM] Failed to initialize dynamic system: {e}")
+        if self._is_dynamic_system_ready:
+            return
+        # Concurrent callers wait on the same initialization
+        if self._init_task is None:
+            self._init_task = asyncio.ensure_future(self._initialize_dynamic_system())
+        await self._init_task
+
+    async def _initialize_dynamic_system(self):
+        try:
+            await self.dynamic_system.initialize()
+            self._is_dynamic_system_ready = True
+            logger.info("Dynamic tool system initialized")
+        except Exception as e:
+            logger.error("Failed to initialize dynamic system: %s", e)
+            self._init_task = None
 
     async def handle_tool_calls(self, tool_calls):
         """Handle tool function calls using dynamic tool system"""
         if not self._is_dynamic_system_ready:
             await self._ensure_dynamic_system_ready()
         
-        results = []
-        
-        for tool_call in tool_calls:
-            function_name = tool_call["function"]["name"]
-            function_args = tool_call["function"]["arguments"]
-            
+        registry = self.dynamic_system.registry
+        calls = [(tool_call["function"]["name"], self._parse_tool_args(tool_call["function"]["arguments"]))
+                 for tool_call in tool_calls]
+
+        # Registered tools run concurrently under the registry's cap (MAX_CONCURRENT_TOOLS), results in input order
+        dynamic = [i for i, (name, _) in enumerate(calls) if registry.get_tool(name)]
+        for i in dynamic:
+            logger.info("Executing dynamic tool: %s", calls[i][0])
+        raw_results = await registry.execute_many(
+            [(calls[i][0], {**calls[i][1], "user_request": f"Tool call: {calls[i][0]}"}) for i in dynamic])
+        raw_by_index = dict(zip(dynamic, raw_results))
+
+        return [await self._tool_result_message(tool_call, name, args, raw_by_index.get(i))
+                for i, (tool_call, (name, args)) in enumerate(zip(tool_calls, calls))]
+
+    @staticmethod
+    def _parse_tool_args(function_args):
+        """Tool call arguments arrive as a JSON string, anything unparsable becomes no arguments"""
+        if isinstance(function_args, str):
             try:
-                # Parse JSON arguments if needed
-                if isinstance(function_args, str):
-                    try:
-                        function_args = json.loads(function_args)
-                    except:
-                        function_args = {}
-                
-                # Get tool from dynamic system
-                tool = self.dynamic_system.registry.get_tool(function_name)
-                
-                if tool:
-                    # Execute using dynamic tool system
-                    print(f"[TOOL LLM] Executing dynamic tool: {function_name}")
-                    tool_result = await tool.execute_with_monitoring(
-                        user_request=f"Tool call: {function_name}",
-                        **function_args
-                    )
-                    
-                    # Format result - check for tool failure
-                    if "error" in tool_result or not tool_result.get("success", True):
-                        # Use failure handler for tool failures
-                        error_info = {
-                            "exception": tool_result.get("error", "Tool returned success=False"),
-                            "error_type": "execution_error"
-                        }
-                        failure_response = handle_tool_failure(function_name, error_info, function_args.get("query", ""))
-                        result = failure_response["fallback_response"]
-                    else:
-                        result = str(tool_result.get("result", tool_result))
-                        
+                function_args = orjson.loads(function_args)
+            except orjson.JSONDecodeError:
+                return {}
+        return function_args if isinstance(function_args, dict) else {}
+
+    async def _tool_result_message(self, tool_call, function_name, function_args, tool_result):
+        """Turn one tool call's raw result (None for tools outside the registry) into its result message"""
+        try:
+            if tool_result is not None:
+                # Format result - check for tool failure
+                if "error" in tool_result or not tool_result.get("success", True):
+                    # Use failure handler for tool failures
+                    error_info = {
+                        "exception": tool_result.get("error", "Tool returned success=False"),
+                        "error_type": "execution_error"
+                    }
+                    failure_response = handle_tool_failure(function_name, error_info, function_args.get("query", ""))
+                    result = failure_response["fallback_response"]
                 else:
-                    # Fallback for unknown tools
-                    result = await self._handle_fallback_tool(function_name, function_args)
-                
-            except Exception as e:
-                # Use failure handler to generate appropriate response
-                error_info = {"exception": e, "error_type": "execution_error"}
-                failure_response = handle_tool_failure(function_name, error_info, function_args.get("query", ""))
-                result = failure_response["fallback_response"]
-                print(f"[TOOL LLM] Tool execution failed: {e}")
-            
-            # Store both OpenAI format and raw result for signals
-            results.append({
-                "tool_call_id": tool_call["id"],
-                "role": "tool", 
-                "content": result,
-                "raw_result": tool_result  # Store the raw result for textLLM
-            })
-            
-            print(f"[TOOL LLM] Executed {function_name}: {result[:100]}...")
-        
-        return results
-    
+                    result = _serialize_tool_result(tool_result.get("result", tool_result))
+            else:
+                # Fallback for unknown tools
+                result = await self._handle_fallback_tool(function_name, function_args)
+
+        except Exception as e:
+            # Use failure handler to generate appropriate response
+            error_info = {"exception": e, "error_type": "execution_error"}
+            failure_response = handle_tool_failure(function_name, error_info, function_args.get("query", ""))
+            result = failure_response["fallback_response"]
+            logger.error("Tool execution failed: %s", e)
+
+        logger.info("Executed %s: %.100s...", function_name, result)
+
+        # Store both OpenAI format and raw result for signals
+        return {
+            "tool_call_id": tool_call["id"],
+            "role": "tool",
+            "content": result,
+            "raw_result": tool_result  # Store the raw result for textLLM
+        }
+
     async def _handle_fallback_tool(self, function_name: str, function_args: dict) -> str:
         """Handle fallback tools not in dynamic system"""
         if function_name == "get_current_time":
@@ -251,125 +318,133 @@ Execute the appropriate tools based on the request: "{tool_request}" """
 
     def prompt(self):
         """Override prompt method to handle tool results without sending to user"""
-        # Run async method in new event loop since this is called from sync context
-        import threading
-        try:
-            # Check if we're already in an async context
-            loop = asyncio.get_running_loop()
-            # If we get here, we're in an async context
-            asyncio.create_task(self._async_prompt())
-        except RuntimeError:
-            # No running event loop, create new one in thread
-            thread = threading.Thread(target=self._run_async_prompt, daemon=True)
-            thread.start()
-    
-    def _run_async_prompt(self):
-        """Run async prompt in new event loop"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self._async_prompt())
-        finally:
-            loop.close()
-    
+        # Always run on the tool loop: the aiohttp session is bound to it
+        asyncio.run_coroutine_threadsafe(self._async_prompt(), _LOOP)
+
     def prompt_async(self):
         """Async version that returns Future for hybrid execution"""
-        from concurrent.futures import ThreadPoolExecutor
-        import concurrent.futures
-        
-        # Create a future that will be resolved when tool execution completes
-        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ToolLLM-Async")
-        future = executor.submit(self._sync_prompt_wrapper)
-        
-        # Store executor reference to prevent garbage collection
-        future.executor = executor
-        
-        return future
-    
-    def _sync_prompt_wrapper(self):
-        """Synchronous wrapper for async prompt - used by prompt_async"""
+        return asyncio.run_coroutine_threadsafe(self._async_prompt(), _LOOP)
+
+    @classmethod
+    def _get_session(cls):
+        """Lazily create the aiohttp session on the tool loop"""
+        if cls._session is None or cls._session.closed:
+            # Verified TLS; OPENAI_CA_BUNDLE points at a custom CA (e.g. a corporate proxy)
+            ssl_context = ssl.create_default_context(cafile=os.environ.get('OPENAI_CA_BUNDLE'))
+            cls._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, limit_per_host=8, ssl=ssl_context,
+                                               keepalive_timeout=cls._KEEPALIVE_SECONDS),
+                timeout=aiohttp.ClientTimeout(total=60, connect=5)
+            )
+        return cls._session
+
+    @classmethod
+    async def aclose(cls):
+        """Close the shared session and its pooled connections"""
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+
+    async def _close_all(self):
+        """Close the tools' own resources (e.g. the weather tool's session), then the shared session"""
+        await self.dynamic_system.registry.aclose()
+        await self.aclose()
+
+    def close(self):
+        """Teardown hook for sync callers"""
         try:
-            # Create new event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(self._async_prompt())
-                return result
-            finally:
-                loop.close()
+            asyncio.run_coroutine_threadsafe(self._close_all(), _LOOP).result(timeout=5)
         except Exception as e:
-            print(f"[TOOL LLM] Error in async execution: {e}")
-            return None
-    
+            logger.error("Error closing HTTP sessions: %s", e)
+
+    async def _warmup_session(self):
+        """Open a pooled connection (DNS + TCP + TLS) unless a recent one is still alive"""
+        if time.monotonic() - ToolLLMWrapper._last_request < self._KEEPALIVE_SECONDS:
+            return
+        try:
+            async with self._get_session().head("https://api.openai.com/v1/",
+                                                timeout=aiohttp.ClientTimeout(total=5)):
+                pass
+        except Exception as e:
+            logger.warning("Connection warm-up failed: %s", e)
+
     async def _async_prompt(self):
         """Async version of prompt method"""
         if not self.llmState.enabled:
             return
 
         self.signals.tool_llm_thinking = True
+
+        # Nothing to act on: answer without a round trip
+        context_for_tools = self._resolve_context()
+        if len(context_for_tools.strip()) < 3:
+            logger.info("Empty tool request - skipping execution")
+            self.signals.tool_results = [{"status": "no_tools_needed", "message": "No external tools were needed for this request"}]
+            self.signals.new_message = True
+            self.signals.tool_llm_thinking = False
+            return
+
         self.signals.new_message = False
         
         # Don't put in sio_queue to avoid WebSocket broadcasts
         # self.signals.sio_queue.put(("reset_next_message", None))
 
-        data = await self.prepare_payload()
-        
-        # Log the prompt being sent to Tool LLM
-        print(f"[TOOL LLM] Payload: {data}")
-        if 'messages' in data and len(data['messages']) > 0:
-            print(f"[TOOL LLM] Prompt content: {data['messages'][0]['content'][:500]}{'...' if len(data['messages'][0]['content']) > 500 else ''}")
-            print(f"[TOOL LLM] Available tools: {[tool['function']['name'] for tool in data.get('tools', [])]}")
+        # Connect while tools are being selected. Never waited on: if the probe is still running when the
+        # payload is ready the POST simply opens its own connection. The reference keeps the task alive
+        if self._warmup_task is None or self._warmup_task.done():
+            self._warmup_task = asyncio.ensure_future(self._warmup_session())
+        data = await self.prepare_payload(context_for_tools)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Payload: %s", data.decode())
 
         try:
-            stream_response = requests.post("https://api.openai.com/v1/chat/completions", 
-                                          headers=self.headers, json=data,
-                                          verify=False, stream=True)
-            response_stream = sseclient.SSEClient(stream_response)
-
             AI_message = ''
-            tool_calls = []
-            
-            for event in response_stream.events():
-                if self.llmState.next_cancelled:
-                    continue
+            tool_calls = {}
 
-                try:
-                    payload = json.loads(event.data)
-                    
-                    if 'choices' in payload and len(payload['choices']) > 0:
-                        delta = payload['choices'][0].get('delta', {})
-                        
-                        # Handle tool calls
-                        if 'tool_calls' in delta:
-                            for tool_call in delta['tool_calls']:
-                                if len(tool_calls) <= tool_call['index']:
-                                    tool_calls.extend([None] * (tool_call['index'] + 1 - len(tool_calls)))
-                                
-                                if tool_calls[tool_call['index']] is None:
-                                    tool_calls[tool_call['index']] = tool_call
-                                else:
-                                    # Merge tool call data
-                                    existing = tool_calls[tool_call['index']]
-                                    if 'function' in tool_call and 'arguments' in tool_call['function']:
-                                        if 'function' not in existing:
-                                            existing['function'] = {}
-                                        if 'arguments' not in existing['function']:
-                                            existing['function']['arguments'] = ''
-                                        existing['function']['arguments'] += tool_call['function']['arguments']
-                        
-                        # Handle regular content
-                        chunk = delta.get('content', '')
-                        if chunk:
-                            AI_message += chunk
-                            
-                except Exception as e:
-                    # Skip empty or malformed data without printing debug message
-                    if hasattr(self, '_last_error') and str(e) == str(self._last_error):
-                        pass  # Don't repeat same error
-                    else:
-                        print(f"DEBUG: Error parsing event data: {e}")
-                        self._last_error = e
-                    continue
+            session = self._get_session()
+            async with session.post("https://api.openai.com/v1/chat/completions",
+                                    headers=self.headers, data=data) as resp:
+                ToolLLMWrapper._last_request = time.monotonic()
+                async for line in _iter_sse_data(resp.content):
+                    if self.llmState.next_cancelled:
+                        continue
+
+                    try:
+                        delta = _parse_delta(line)
+
+                        if delta:
+                            # Handle tool calls: accumulate argument fragments per index
+                            if 'tool_calls' in delta:
+                                for tool_call in delta['tool_calls']:
+                                    tc = tool_calls.get(tool_call['index'])
+                                    if tc is None:
+                                        tc = tool_calls[tool_call['index']] = {
+                                            "id": tool_call.get('id'),
+                                            "type": "function",
+                                            "function": {"name": "", "arguments": []}
+                                        }
+                                    elif tool_call.get('id'):
+                                        tc["id"] = tool_call['id']
+                                    function = tool_call.get('function')
+                                    if function:
+                                        if function.get('name'):
+                                            tc["function"]["name"] = function['name']
+                                        if function.get('arguments'):
+                                            tc["function"]["arguments"].append(function['arguments'])
+
+                            # Handle regular content
+                            chunk = delta.get('content', '')
+                            if chunk:
+                                AI_message += chunk
+
+                    except Exception as e:
+                        # Skip empty or malformed data without printing debug message
+                        if str(e) == str(self._last_error):
+                            pass  # Don't repeat same error
+                        else:
+                            logger.debug("Error parsing event data: %s", e)
+                            self._last_error = e
+                        continue
 
             if self.llmState.next_cancelled:
                 self.llmState.next_cancelled = False
@@ -378,7 +453,7 @@ Execute the appropriate tools based on the request: "{tool_request}" """
 
             # Check if LLM decided no tools are needed
             if "NO_TOOLS_NEEDED" in AI_message:
-                print("[TOOL LLM] No tools needed - skipping execution")
+                logger.info("No tools needed - skipping execution")
                 # Signal that tool execution failed/was skipped
                 self.signals.tool_results = [{"status": "no_tools_needed", "message": "No external tools were needed for this request"}]
                 self.signals.new_message = True  # Trigger textLLM to provide fallback response
@@ -387,16 +462,18 @@ Execute the appropriate tools based on the request: "{tool_request}" """
 
             # Process tool calls if any
             if tool_calls:
-                tool_results = await self.handle_tool_calls([tc for tc in tool_calls if tc is not None])
+                for tc in tool_calls.values():
+                    tc["function"]["arguments"] = "".join(tc["function"]["arguments"])
+                tool_results = await self.handle_tool_calls([tool_calls[i] for i in sorted(tool_calls)])
                 
                 # Replace tool results (don't accumulate old results)
                 self.signals.tool_results = tool_results
                     
-                print(f"[TOOL LLM] Executed {len(tool_results)} tool calls")
+                logger.info("Executed %d tool calls", len(tool_results))
                 
                 # Trigger new message to prompt main LLM with tool results
                 if tool_results:
-                    print("[TOOL LLM] Triggering new message with tool results")
+                    logger.info("Triggering new message with tool results")
                     self.signals.new_message = True
                 else:
                     # No successful tool results - notify textLLM of failure
@@ -412,8 +489,9 @@ Execute the appropriate tools based on the request: "{tool_request}" """
             self.signals.tool_llm_thinking = False
             
         except Exception as e:
-            print(f"[TOOL LLM] Error: {e}")
+            logger.error("Error: %s", e)
             # Signal tool execution error to textLLM
             self.signals.tool_results = [{"status": "error", "message": f"Tool execution error: {str(e)}"}]
             self.signals.new_message = True
-            self.signals.tool_llm_thinking = False
\ No newline at end of file
+            self.signals.tool_llm_thinking = False
+
@@ -0,0 +1,51 @@
+"""
+Tool LLM prompt formatting, kept free of wrapper state and fully annotated so it can be
+compiled with mypyc (python -m mypyc llmWrappers/toolPrompt.py) where a C toolchain is available
+"""
+import re
+from typing import Dict, List
+
+_TOOL_TRIGGER_RE = re.compile(r'\[TOOL_TRIGGER:[^\]]*\]')
+
+_TOOL_PROMPT_TMPL = """You are a tool execution assistant. Luna has requested tool execution with a specific request.
+
+RECENT CONVERSATION:
+{conversation_context}
+
+TOOL REQUEST: "{tool_request}"
+
+YOUR TASK:
+Analyze the tool request and execute the appropriate tools to fulfill it. The request describes what the user needs.
+
+INSTRUCTIONS:
+1. Understand what "{tool_request}" is asking for
+2. Select and execute the most appropriate tools available to fulfill this request
+3. If the request is clear and specific, execute the relevant tools
+4. If the request is too vague or no tools are needed, respond "NO_TOOLS_NEEDED"
+
+EXAMPLES:
+- Request: "get current weather" → Execute weather tool
+- Request: "search for minecraft tutorials" → Execute search/web tool  
+- Request: "calculate complex math problem" → Execute calculator/math tool
+- Request: "find information about AI news" → Execute search/news tool
+- Request: "play music" → Execute audio/music tool
+- Request: "take a screenshot" → Execute screen capture tool
+
+Execute the appropriate tools based on the request: "{tool_request}" """
+
+def format_tool_prompt(history: List[Dict[str, str]], tool_request: str) -> str:
+    """Build the tool LLM prompt from the recent history (chronological) and the trigger request"""
+    recent_messages: List[str] = []
+    for msg in history:
+        content = msg["content"]
+        if not content.strip():
+            continue
+        role = msg["role"]
+        if role == "user":
+            recent_messages.append("User: " + content)
+        elif role == "assistant":
+            # TOOL_TRIGGER tokens are stripped from Luna's messages
+            recent_messages.append("Luna: " + _TOOL_TRIGGER_RE.sub('', content).strip())
+
+    conversation_context = "\n".join(recent_messages) if recent_messages else "No recent conversation"
+    return _TOOL_PROMPT_TMPL.format(conversation_context=conversation_context, tool_request=tool_request)
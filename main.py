@@ -119,6 +119,7 @@ async def main():
     print("WEBSOCKET EXITED ======================")
     prompter_thread.join()
     print("PROMPTER EXITED ======================")
+    llms["tool"].close()
     # stt_thread.join()
     # print("STT EXITED ======================")
 
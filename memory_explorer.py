@@ -4,40 +4,134 @@ Interactive Memory Explorer
 ChromaDB의 모든 컬렉션과 데이터를 대화형으로 탐색
 """
 
+import re
+import bisect
+import sys
 import chromadb
 from chromadb.config import Settings
-import json
 import uuid
-from typing import List, Dict, Any, Optional
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Tuple, Callable
+try:
+    # orjson이 있으면 사용, 없으면 표준 json
+    import orjson
+
+    def _dumps(obj, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+except ImportError:
+    import json
+
+    def _dumps(obj, pretty: bool = False) -> str:
+        return json.dumps(obj, indent=2 if pretty else None, ensure_ascii=False)
+try:
+    # 명령 자동완성/히스토리, 설치되어 있지 않으면 input()으로 동작
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import WordCompleter
+    from prompt_toolkit.history import InMemoryHistory
+except ImportError:
+    PromptSession = None
 
 from constants import CHROMA_DB_PATH, CHROMA_SETTINGS
 
+# 전체 컬렉션을 훑어야 할 때 한 번에 가져오는 아이템 수
+PAGE_SIZE = 1000
+# ID만 받을 때의 페이지 크기 (문서/메타데이터가 없어 더 크게 받음)
+ID_PAGE_SIZE = 10000
+# show_collections에서 count()를 동시에 실행할 최대 스레드 수
+COUNT_WORKERS = 8
+# upsert 한 번에 묶는 아이템 수 (클라이언트 max_batch_size를 넘지 않도록 제한)
+UPSERT_BATCH_SIZE = 250
+
+# analyze_collection 컨텐츠 타입 키워드 (where_document 조회와 로컬 스캔 패턴에 공통으로 사용)
+TOOL_KEYWORDS = ("Tool Name:", "Function:", "get_weather", "search_web", "calculate_math")
+CONV_KEYWORDS = ("Luna:", "John:", "Chat:", "?", "favorite")
+TOOL_RE = re.compile("|".join(map(re.escape, TOOL_KEYWORDS)))
+CONV_RE = re.compile("|".join(map(re.escape, CONV_KEYWORDS)))
+
+_UUID_RE = re.compile(r"^[0-9a-f-]{36}$")
+
+
+def _looks_like_uuid(value: str) -> bool:
+    """접두사가 아닌 전체 ID(uuid4 문자열)인지 확인"""
+    return _UUID_RE.match(value) is not None
+
+
+def iter_pages(collection, include, page_size: int = PAGE_SIZE):
+    """컬렉션을 limit/offset 페이지 단위로 순회 (전체를 한 번에 메모리에 올리지 않음)"""
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=include)
+        if not page['ids']:
+            return
+        yield page
+        if len(page['ids']) < page_size:
+            return
+        offset += page_size
+
 
 class MemoryExplorer:
     def __init__(self, db_path: str = None):
         """메모리 탐색기 초기화"""
         self.db_path = db_path or CHROMA_DB_PATH
-        self.client = chromadb.PersistentClient(
+        self.current_collection = None
+        # 컬렉션 이름 -> 아이템 수 (추가/삭제 시 갱신, 컬렉션 선택 시 새로 셈)
+        self._count_cache: Dict[str, int] = {}
+        # 접두사 검색용 현재 컬렉션의 정렬된 ID (필요할 때 생성)
+        self._sorted_ids: Optional[List[str]] = None
+
+    @cached_property
+    def client(self):
+        """ChromaDB 클라이언트 (처음 사용할 때 연결)"""
+        return chromadb.PersistentClient(
             path=self.db_path, 
             settings=Settings(**CHROMA_SETTINGS)
         )
-        self.current_collection = None
-        
-        print(f"🔍 Memory Explorer initialized - Database: {db_path}")
+
+    def banner(self):
+        """시작 배너와 컬렉션 목록 표시"""
+        print(f"🔍 Memory Explorer initialized - Database: {self.db_path}")
         self.show_collections()
 
+    def _count(self, collection) -> int:
+        """컬렉션 아이템 수 (한 번 센 뒤에는 캐시된 값 사용)"""
+        count = self._count_cache.get(collection.name)
+        if count is None:
+            count = self._count_cache[collection.name] = collection.count()
+        return count
+
+    def _adjust_count(self, collection, delta: int):
+        """추가/삭제한 개수만큼 캐시된 아이템 수 보정"""
+        if collection.name in self._count_cache:
+            self._count_cache[collection.name] += delta
+
+    @cached_property
+    def _collections_by_name(self) -> Dict[str, Any]:
+        """컬렉션 이름 -> 컬렉션 (list_collections 결과를 한 번만 받아 재사용)"""
+        return {collection.name: collection for collection in self.client.list_collections()}
+
     def show_collections(self):
         """모든 컬렉션 목록 표시"""
         try:
-            collections = self.client.list_collections()
+            # 목록 표시는 새로고침: 다른 프로세스가 만든 컬렉션도 반영
+            self.__dict__.pop("_collections_by_name", None)
+            collections = list(self._collections_by_name.values())
             print(f"\n📚 Available Collections ({len(collections)}):")
             
             if not collections:
                 print("  No collections found")
                 return
+            
+            # 아직 세지 않은 컬렉션의 count()는 서로 독립적이므로 동시에 실행
+            uncounted = [collection for collection in collections if collection.name not in self._count_cache]
+            if len(uncounted) > 1:
+                with ThreadPoolExecutor(max_workers=min(COUNT_WORKERS, len(uncounted))) as executor:
+                    for collection, count in zip(uncounted, executor.map(lambda c: c.count(), uncounted)):
+                        self._count_cache[collection.name] = count
                 
             for i, collection in enumerate(collections):
-                count = collection.count()
+                count = self._count(collection)
                 print(f"  [{i+1}] {collection.name} ({count} items)")
                 if hasattr(collection, 'metadata') and collection.metadata:
                     desc = collection.metadata.get('description', '')
@@ -50,29 +144,33 @@ class MemoryExplorer:
     def select_collection(self, name_or_index):
         """컬렉션 선택"""
         try:
-            collections = self.client.list_collections()
+            collections = self._collections_by_name
             
             # 숫자로 선택한 경우
             if name_or_index.isdigit():
                 index = int(name_or_index) - 1
                 if 0 <= index < len(collections):
-                    collection = collections[index]
-                    self.current_collection = self.client.get_collection(collection.name)
-                    print(f"✅ Selected: {collection.name} ({self.current_collection.count()} items)")
-                    return True
+                    collection = list(collections.values())[index]
                 else:
                     print(f"❌ Invalid index. Use 1-{len(collections)}")
                     return False
             
             # 이름으로 선택한 경우
             else:
-                try:
-                    self.current_collection = self.client.get_collection(name_or_index)
-                    print(f"✅ Selected: {name_or_index} ({self.current_collection.count()} items)")
-                    return True
-                except Exception:
-                    print(f"❌ Collection '{name_or_index}' not found")
-                    return False
+                collection = collections.get(name_or_index)
+                if collection is None:
+                    # 목록을 받은 뒤에 생긴 컬렉션일 수 있으므로 한 번 더 확인
+                    try:
+                        collection = collections[name_or_index] = self.client.get_collection(name_or_index)
+                    except Exception:
+                        print(f"❌ Collection '{name_or_index}' not found")
+                        return False
+            
+            self.current_collection = collection
+            self._sorted_ids = None
+            self._count_cache.pop(collection.name, None)
+            print(f"✅ Selected: {collection.name} ({self._count(collection)} items)")
+            return True
                     
         except Exception as e:
             print(f"❌ Error selecting collection: {e}")
@@ -89,45 +187,91 @@ class MemoryExplorer:
                 print(f"🔍 Searching for: '{search_query}'")
                 results = self.current_collection.query(
                     query_texts=[search_query],
-                    n_results=min(limit, self.current_collection.count())
+                    n_results=min(limit, self._count(self.current_collection)),
+                    include=["documents", "metadatas", "distances"]
                 )
                 
                 if not results['ids'][0]:
                     print("No results found")
                     return
                     
+                # 아이템마다 print하지 않고 한 번에 출력
+                buf = []
                 for i in range(len(results['ids'][0])):
-                    item_id = results['ids'][0][i]
+                    short_id = results['ids'][0][i][:12]
                     document = results['documents'][0][i]
-                    metadata = results['metadatas'][0][i] or {}
+                    metadata = results['metadatas'][0][i]
                     distance = results['distances'][0][i]
+                    doc_preview = document[:150]
                     
-                    print(f"\n📄 [{i+1}] ID: {item_id[:12]}...")
-                    print(f"   📊 Relevance: {(1-distance)*100:.1f}%")
-                    print(f"   📝 Content: {document[:150]}{'...' if len(document) > 150 else ''}")
+                    buf.append(f"\n📄 [{i+1}] ID: {short_id}...")
+                    buf.append(f"   📊 Relevance: {(1-distance)*100:.1f}%")
+                    buf.append(f"   📝 Content: {doc_preview}{'...' if len(document) > 150 else ''}")
                     
                     if metadata:
-                        print(f"   🏷️  Meta: {metadata}")
+                        buf.append(f"   🏷️  Meta: {metadata}")
+                sys.stdout.write("\n".join(buf) + "\n")
             else:
-                results = self.current_collection.get()
-                total = len(results['ids'])
+                results = self.current_collection.get(limit=limit, include=["documents", "metadatas"])
+                total = self._count(self.current_collection)
                 
-                print(f"📋 Items in {self.current_collection.name} (showing {min(limit, total)} of {total}):")
+                print(f"📋 Items in {self.current_collection.name} (showing {len(results['ids'])} of {total}):")
                 
-                for i in range(min(limit, total)):
-                    item_id = results['ids'][i]
+                buf = []
+                for i in range(len(results['ids'])):
+                    short_id = results['ids'][i][:12]
                     document = results['documents'][i]
-                    metadata = results['metadatas'][i] or {}
+                    metadata = results['metadatas'][i]
+                    doc_preview = document[:150]
                     
-                    print(f"\n📄 [{i+1}] ID: {item_id[:12]}...")
-                    print(f"   📝 Content: {document[:150]}{'...' if len(document) > 150 else ''}")
+                    buf.append(f"\n📄 [{i+1}] ID: {short_id}...")
+                    buf.append(f"   📝 Content: {doc_preview}{'...' if len(document) > 150 else ''}")
                     
                     if metadata:
-                        print(f"   🏷️  Meta: {metadata}")
+                        buf.append(f"   🏷️  Meta: {metadata}")
+                if buf:
+                    sys.stdout.write("\n".join(buf) + "\n")
                         
         except Exception as e:
             print(f"❌ Error showing items: {e}")
 
+    def find_item(self, index_or_id: str, include: List[str]):
+        """번호(1부터) 또는 ID/ID 접두사로 아이템 하나를 찾아 (id, document, metadata) 반환"""
+        # 인덱스로 선택: 해당 위치 한 건만 가져옴
+        if index_or_id.isdigit():
+            index = int(index_or_id) - 1
+            results = self.current_collection.get(limit=1, offset=index, include=include) if index >= 0 else None
+            if not results or not results['ids']:
+                print(f"❌ Invalid index. Use 1-{self._count(self.current_collection)}")
+                return None
+            i = 0
+        else:
+            if _looks_like_uuid(index_or_id):
+                # 전체 ID: 스캔 없이 바로 조회
+                item_id = index_or_id
+            else:
+                # ID 접두사: 정렬된 ID 목록에서 이진 탐색
+                sorted_ids = self._get_sorted_ids()
+                i = bisect.bisect_left(sorted_ids, index_or_id)
+                item_id = sorted_ids[i] if i < len(sorted_ids) and sorted_ids[i].startswith(index_or_id) else None
+            results = self.current_collection.get(ids=[item_id], include=include) if item_id else None
+            if not results or not results['ids']:
+                print(f"❌ Item with ID '{index_or_id}' not found")
+                return None
+            i = 0
+        
+        document = results['documents'][i] if 'documents' in include else None
+        metadata = (results['metadatas'][i] or {}) if 'metadatas' in include else None
+        return results['ids'][i], document, metadata
+
+    def _get_sorted_ids(self) -> List[str]:
+        """현재 컬렉션의 정렬된 ID 목록 (처음 접두사 검색 시 ID만 받아 만들고 추가/삭제 시 갱신)"""
+        if self._sorted_ids is None:
+            self._sorted_ids = sorted(
+                id_ for page in iter_pages(self.current_collection, [], page_size=ID_PAGE_SIZE) for id_ in page['ids']
+            )
+        return self._sorted_ids
+
     def show_item_detail(self, index_or_id: str):
         """특정 아이템 상세 보기"""
         if not self.current_collection:
@@ -135,37 +279,15 @@ class MemoryExplorer:
             return
             
         try:
-            results = self.current_collection.get()
-            
-            # 인덱스로 선택
-            if index_or_id.isdigit():
-                index = int(index_or_id) - 1
-                if 0 <= index < len(results['ids']):
-                    item_id = results['ids'][index]
-                    document = results['documents'][index] 
-                    metadata = results['metadatas'][index] or {}
-                else:
-                    print(f"❌ Invalid index. Use 1-{len(results['ids'])}")
-                    return
-            else:
-                # ID로 검색
-                found = False
-                for i, id_ in enumerate(results['ids']):
-                    if id_.startswith(index_or_id) or id_ == index_or_id:
-                        item_id = id_
-                        document = results['documents'][i]
-                        metadata = results['metadatas'][i] or {}
-                        found = True
-                        break
-                
-                if not found:
-                    print(f"❌ Item with ID '{index_or_id}' not found")
-                    return
+            item = self.find_item(index_or_id, ["documents", "metadatas"])
+            if item is None:
+                return
+            item_id, document, metadata = item
             
             print(f"\n🔍 ITEM DETAILS")
             print(f"   🆔 ID: {item_id}")
             print(f"   📝 Content:\n{document}")
-            print(f"   🏷️  Metadata: {json.dumps(metadata, indent=2, ensure_ascii=False)}")
+            print(f"   🏷️  Metadata: {_dumps(metadata, pretty=True)}")
             
         except Exception as e:
             print(f"❌ Error showing item detail: {e}")
@@ -177,32 +299,20 @@ class MemoryExplorer:
             return False
             
         try:
-            results = self.current_collection.get()
-            item_id = None
-            
-            # 인덱스로 선택
-            if index_or_id.isdigit():
-                index = int(index_or_id) - 1
-                if 0 <= index < len(results['ids']):
-                    item_id = results['ids'][index]
-                else:
-                    print(f"❌ Invalid index. Use 1-{len(results['ids'])}")
-                    return False
-            else:
-                # ID로 검색
-                for id_ in results['ids']:
-                    if id_.startswith(index_or_id) or id_ == index_or_id:
-                        item_id = id_
-                        break
-                
-                if not item_id:
-                    print(f"❌ Item with ID '{index_or_id}' not found")
-                    return False
+            item = self.find_item(index_or_id, [])
+            if item is None:
+                return False
+            item_id = item[0]
             
             # 확인 요청
             confirm = input(f"🗑️  Delete item {item_id[:12]}...? (y/N): ").lower()
             if confirm == 'y':
                 self.current_collection.delete(ids=[item_id])
+                self._adjust_count(self.current_collection, -1)
+                if self._sorted_ids is not None:
+                    i = bisect.bisect_left(self._sorted_ids, item_id)
+                    if i < len(self._sorted_ids) and self._sorted_ids[i] == item_id:
+                        del self._sorted_ids[i]
                 print(f"✅ Deleted item: {item_id[:12]}...")
                 return True
             else:
@@ -226,6 +336,9 @@ class MemoryExplorer:
                 documents=[content],
                 metadatas=[metadata or {}]
             )
+            self._adjust_count(self.current_collection, 1)
+            if self._sorted_ids is not None:
+                bisect.insort(self._sorted_ids, item_id)
             print(f"✅ Added item: {item_id[:12]}... - {content[:50]}{'...' if len(content) > 50 else ''}")
             return True
             
@@ -233,6 +346,38 @@ class MemoryExplorer:
             print(f"❌ Error adding item: {e}")
             return False
 
+    def add_memories_bulk(self, items: List[Tuple[str, Dict]]):
+        """(content, metadata) 목록을 배치 upsert로 현재 컬렉션에 추가"""
+        if not self.current_collection:
+            print("❌ No collection selected")
+            return []
+            
+        try:
+            item_ids = [str(uuid.uuid4()) for _ in items]
+            batch_size = min(UPSERT_BATCH_SIZE, self.client.get_max_batch_size())
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                self.current_collection.upsert(
+                    ids=item_ids[start:start + batch_size],
+                    documents=[content for content, _ in batch],
+                    metadatas=[metadata or {} for _, metadata in batch]
+                )
+                self._adjust_count(self.current_collection, len(batch))
+                if self._sorted_ids is not None:
+                    for item_id in item_ids[start:start + batch_size]:
+                        bisect.insort(self._sorted_ids, item_id)
+            print(f"✅ Added {len(item_ids)} items")
+            return item_ids
+            
+        except Exception as e:
+            print(f"❌ Error adding items: {e}")
+            return []
+
+    def _ids_containing(self, keywords: Tuple[str, ...]) -> set:
+        """키워드 중 하나라도 포함한 문서의 ID 집합 (문서 본문은 받지 않음)"""
+        where_document = {"$or": [{"$contains": keyword} for keyword in keywords]}
+        return set(self.current_collection.get(where_document=where_document, include=[])['ids'])
+    
     def analyze_collection(self):
         """컬렉션 분석"""
         if not self.current_collection:
@@ -240,8 +385,7 @@ class MemoryExplorer:
             return
             
         try:
-            results = self.current_collection.get()
-            total = len(results['ids'])
+            total = self._count(self.current_collection)
             
             print(f"\n📊 ANALYSIS: {self.current_collection.name}")
             print(f"   📦 Total items: {total}")
@@ -249,32 +393,50 @@ class MemoryExplorer:
             if total == 0:
                 return
                 
-            # 메타데이터 분석
-            metadata_types = {}
-            content_types = {"tool_data": 0, "conversation": 0, "other": 0}
+            # 컨텐츠 타입 분석: 키워드 매칭은 where_document로 서버에서 처리하고 ID만 받아옴
+            meta_counter = Counter()
+            try:
+                tool_ids = self._ids_containing(TOOL_KEYWORDS)
+                conversation_ids = self._ids_containing(CONV_KEYWORDS) - tool_ids
+                content_types = {
+                    "tool_data": len(tool_ids),
+                    "conversation": len(conversation_ids),
+                    "other": total - len(tool_ids) - len(conversation_ids)
+                }
+                scan_documents = False
+            except Exception as e:
+                # where_document를 지원하지 않으면 문서를 받아 직접 매칭
+                print(f"   ⚠️  where_document query failed, scanning documents: {e}")
+                content_types = {"tool_data": 0, "conversation": 0, "other": 0}
+                scan_documents = True
             
-            for i, (doc, meta) in enumerate(zip(results['documents'], results['metadatas'])):
-                # 메타데이터 타입 분석
-                if meta:
-                    for key, value in meta.items():
-                        if key not in metadata_types:
-                            metadata_types[key] = {}
-                        val_str = str(value)
-                        metadata_types[key][val_str] = metadata_types[key].get(val_str, 0) + 1
-                
-                # 컨텐츠 타입 분석
-                if any(keyword in doc for keyword in ['Tool Name:', 'Function:', 'get_weather', 'search_web', 'calculate_math']):
-                    content_types["tool_data"] += 1
-                elif any(keyword in doc for keyword in ['Luna:', 'John:', 'Chat:', '?', 'favorite']):
-                    content_types["conversation"] += 1
-                else:
-                    content_types["other"] += 1
+            include = ["documents", "metadatas"] if scan_documents else ["metadatas"]
+            for results in iter_pages(self.current_collection, include):
+                for i, meta in enumerate(results['metadatas']):
+                    # 메타데이터 타입 분석
+                    if meta:
+                        meta_counter.update((key, str(value)) for key, value in meta.items())
+                    
+                    if not scan_documents:
+                        continue
+                    doc = results['documents'][i]
+                    if TOOL_RE.search(doc) is not None:
+                        content_types["tool_data"] += 1
+                    elif CONV_RE.search(doc) is not None:
+                        content_types["conversation"] += 1
+                    else:
+                        content_types["other"] += 1
             
             print(f"\n   📋 Content Types:")
             for content_type, count in content_types.items():
                 if count > 0:
                     print(f"      {content_type}: {count} ({count/total*100:.1f}%)")
             
+            # 출력용으로 키별로 묶음
+            metadata_types = defaultdict(dict)
+            for (key, val_str), count in meta_counter.items():
+                metadata_types[key][val_str] = count
+            
             print(f"\n   🏷️  Metadata Analysis:")
             if not metadata_types:
                 print(f"      No metadata found")
@@ -312,67 +474,77 @@ class MemoryExplorer:
    add "Luna likes coffee" - Add new memory
 """)
 
+    def _require_arg(self, handler, usage: str):
+        """인자가 필요한 명령: 인자가 없으면 사용법 출력"""
+        def run(arg):
+            if arg:
+                handler(arg)
+            else:
+                print(f"❌ Usage: {usage}")
+        return run
+
+    def _build_dispatch(self) -> Dict[str, Callable[[str], Any]]:
+        """명령 -> 처리 함수 (인자 문자열을 받음)"""
+        dispatch = {
+            'select': self._require_arg(self.select_collection, "select <collection_name_or_number>"),
+            'list': lambda arg: self.show_items(int(arg) if arg.isdigit() else 10),
+            'search': self._require_arg(lambda arg: self.show_items(10, arg), "search <query>"),
+            'detail': self._require_arg(self.show_item_detail, "detail <item_number_or_id>"),
+            'delete': self._require_arg(self.delete_item, "delete <item_number_or_id>"),
+            'add': self._require_arg(self.add_item, "add <content>"),
+        }
+        for cmd in ('help', '?'):
+            dispatch[cmd] = lambda arg: self.show_help()
+        for cmd in ('collections', 'c'):
+            dispatch[cmd] = lambda arg: self.show_collections()
+        for cmd in ('analyze', 'stats'):
+            dispatch[cmd] = lambda arg: self.analyze_collection()
+        # 입력 명령도 intern해서 비교하므로 키를 intern
+        return {sys.intern(cmd): handler for cmd, handler in dispatch.items()}
+
     def run(self):
         """대화형 루프 실행"""
+        self.banner()
         print(f"\n🚀 Welcome to Memory Explorer!")
         print(f"Type 'help' for commands, 'quit' to exit")
         
+        dispatch = self._build_dispatch()
+        quit_commands = frozenset(('quit', 'exit', 'q'))
+        
+        # prompt_toolkit이 있으면 명령 자동완성/히스토리 사용
+        if PromptSession is not None:
+            session = PromptSession(
+                history=InMemoryHistory(),
+                completer=WordCompleter([*dispatch, *quit_commands], sentence=True)
+            )
+            read_command = session.prompt
+        else:
+            read_command = input
+        
         while True:
             try:
                 collection_name = self.current_collection.name if self.current_collection else "None"
                 prompt = f"\n[{collection_name}]> "
                 
-                command = input(prompt).strip()
+                command = read_command(prompt).strip()
                 if not command:
                     continue
-                    
-                parts = command.split(maxsplit=1)
-                cmd = parts[0].lower()
-                arg = parts[1] if len(parts) > 1 else ""
                 
-                if cmd in ['quit', 'exit', 'q']:
+                cmd, _, arg = command.partition(' ')
+                cmd = sys.intern(cmd.lower())
+                arg = arg.strip()
+                
+                if cmd in quit_commands:
                     print("👋 Goodbye!")
                     break
-                elif cmd in ['help', '?']:
-                    self.show_help()
-                elif cmd in ['collections', 'c']:
-                    self.show_collections()
-                elif cmd == 'select':
-                    if arg:
-                        self.select_collection(arg)
-                    else:
-                        print("❌ Usage: select <collection_name_or_number>")
-                elif cmd == 'list':
-                    limit = 10
-                    if arg and arg.isdigit():
-                        limit = int(arg)
-                    self.show_items(limit)
-                elif cmd == 'search':
-                    if arg:
-                        self.show_items(10, arg)
-                    else:
-                        print("❌ Usage: search <query>")
-                elif cmd == 'detail':
-                    if arg:
-                        self.show_item_detail(arg)
-                    else:
-                        print("❌ Usage: detail <item_number_or_id>")
-                elif cmd == 'delete':
-                    if arg:
-                        self.delete_item(arg)
-                    else:
-                        print("❌ Usage: delete <item_number_or_id>")
-                elif cmd == 'add':
-                    if arg:
-                        self.add_item(arg)
-                    else:
-                        print("❌ Usage: add <content>")
-                elif cmd in ['analyze', 'stats']:
-                    self.analyze_collection()
-                else:
+                
+                handler = dispatch.get(cmd)
+                if handler is None:
                     print(f"❌ Unknown command: {cmd}. Type 'help' for available commands.")
+                    continue
+                handler(arg)
                     
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print(f"\n👋 Goodbye!")
                 break
             except Exception as e:
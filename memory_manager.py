@@ -4,83 +4,143 @@ Memory Management Tool
 메모리를 조회, 추가, 삭제할 수 있는 독립적인 관리 도구
 """
 
-import chromadb
-from chromadb.config import Settings
+import sys
 import json
+import orjson
 import uuid
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from types import MappingProxyType
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Tuple
 import argparse
 
 from constants import CHROMA_DB_PATH, CHROMA_MEMORIES_COLLECTION, CHROMA_TOOLS_COLLECTION, CHROMA_SETTINGS, CHROMA_COLLECTION_METADATA
 
+# 메타데이터가 없는 아이템에 공통으로 쓰는 읽기 전용 빈 dict
+_EMPTY = MappingProxyType({})
+
+# upsert 한 번에 묶는 아이템 수 (클라이언트 max_batch_size를 넘지 않도록 제한)
+UPSERT_BATCH_SIZE = 250
+
+# stats에서 where 필터로 바로 세는 메모리 타입 (그 외 타입은 페이지 단위로 집계)
+MEMORY_TYPES = ("short-term", "manual")
+STATS_PAGE_SIZE = 1000
+
+# export 시 한 번에 가져오는 아이템 수
+EXPORT_PAGE_SIZE = 1000
+
+# import 동안 적용하는 SQLite PRAGMA (끝나면 이전 값으로 복구)
+BULK_PRAGMAS = {
+    "journal_mode": "off",
+    "synchronous": "off",
+    "temp_store": "memory",
+    "locking_mode": "exclusive",
+}
+
 
 class MemoryManager:
     def __init__(self, db_path: str = None):
         """메모리 관리자 초기화"""
+        # 클라이언트와 컬렉션은 처음 사용할 때 연결/로드
         self.db_path = db_path or CHROMA_DB_PATH
-        self.client = chromadb.PersistentClient(
+        # 컬렉션 이름 -> 아이템 수 (추가/삭제 시 갱신)
+        self._count_cache: Dict[str, int] = {}
+
+    @cached_property
+    def client(self):
+        # chromadb는 무거우므로 (--help나 인자 오류 시에는 불러오지 않도록) 연결할 때 import
+        import chromadb
+        from chromadb.config import Settings
+        return chromadb.PersistentClient(
             path=self.db_path, 
             settings=Settings(**CHROMA_SETTINGS)
         )
-        
-        # 메인 메모리 컬렉션 (대화 메모리용)
-        self.memory_collection = self.client.get_or_create_collection(
+
+    @cached_property
+    def memory_collection(self):
+        """메인 메모리 컬렉션 (대화 메모리용)"""
+        return self.client.get_or_create_collection(
             name=CHROMA_MEMORIES_COLLECTION,
             metadata=CHROMA_COLLECTION_METADATA[CHROMA_MEMORIES_COLLECTION]
         )
-        
-        # 도구 메타데이터 컬렉션 (도구 검색용)
-        self.tools_collection = self.client.get_or_create_collection(
+
+    @cached_property
+    def tools_collection(self):
+        """도구 메타데이터 컬렉션 (도구 검색용)"""
+        return self.client.get_or_create_collection(
             name=CHROMA_TOOLS_COLLECTION,
             metadata=CHROMA_COLLECTION_METADATA[CHROMA_TOOLS_COLLECTION]
         )
-        
-        print(f"Memory Manager initialized:")
-        print(f"  - Memories: {self.memory_collection.count()} items")
-        print(f"  - Tools: {self.tools_collection.count()} items")
+
+    def _count(self, collection) -> int:
+        """컬렉션 아이템 수 (한 번 센 뒤에는 캐시된 값 사용)"""
+        count = self._count_cache.get(collection.name)
+        if count is None:
+            count = self._count_cache[collection.name] = collection.count()
+        return count
+
+    def _adjust_count(self, collection, delta: int):
+        """추가/삭제한 개수만큼 캐시된 아이템 수 보정"""
+        if collection.name in self._count_cache:
+            self._count_cache[collection.name] += delta
+
+    def _invalidate_count(self, collection):
+        """정확한 증감을 알 수 없을 때 캐시 제거 (다음 조회 시 다시 셈)"""
+        self._count_cache.pop(collection.name, None)
 
     def list_memories(self, limit: int = 20, query: Optional[str] = None) -> List[Dict]:
         """메모리 목록 조회"""
-        print(f"\n=== CONVERSATION MEMORIES ({self.memory_collection.count()} total) ===")
+        print(f"\n=== CONVERSATION MEMORIES ({self._count(self.memory_collection)} total) ===")
         
         if query:
             results = self.memory_collection.query(
                 query_texts=[query],
-                n_results=min(limit, self.memory_collection.count())
+                n_results=min(limit, self._count(self.memory_collection)),
+                include=["documents", "metadatas", "distances"]
             )
+            metadatas = [metadata or _EMPTY for metadata in results['metadatas'][0]]
             memories = []
             for i in range(len(results['ids'][0])):
                 memories.append({
                     'id': results['ids'][0][i],
                     'content': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
+                    'metadata': metadatas[i],
                     'distance': results['distances'][0][i]
                 })
         else:
-            results = self.memory_collection.get()
+            results = self.memory_collection.get(limit=limit, include=["documents", "metadatas"])
+            metadatas = [metadata or _EMPTY for metadata in results['metadatas']]
             memories = []
             count = min(limit, len(results['ids']))
             for i in range(count):
                 memories.append({
                     'id': results['ids'][i],
                     'content': results['documents'][i],
-                    'metadata': results['metadatas'][i] or {}
+                    'metadata': metadatas[i]
                 })
         
+        # 아이템마다 print하지 않고 한 번에 출력
+        buf = []
         for i, memory in enumerate(memories):
-            print(f"\n[{i+1}] ID: {memory['id'][:8]}...")
-            print(f"Content: {memory['content'][:100]}{'...' if len(memory['content']) > 100 else ''}")
-            print(f"Type: {memory['metadata'].get('type', 'unknown')}")
+            short_id = memory['id'][:8]
+            content = memory['content']
+            preview = content[:100]
+            buf.append(f"\n[{i+1}] ID: {short_id}...")
+            buf.append(f"Content: {preview}{'...' if len(content) > 100 else ''}")
+            buf.append(f"Type: {memory['metadata'].get('type', 'unknown')}")
             if 'distance' in memory:
-                print(f"Relevance: {1 - memory['distance']:.3f}")
+                buf.append(f"Relevance: {1 - memory['distance']:.3f}")
+        if buf:
+            sys.stdout.write("\n".join(buf) + "\n")
         
         return memories
 
     def list_tools(self, limit: int = 20) -> List[Dict]:
         """도구 메타데이터 조회"""
-        print(f"\n=== TOOL METADATA ({self.tools_collection.count()} total) ===")
+        print(f"\n=== TOOL METADATA ({self._count(self.tools_collection)} total) ===")
         
-        results = self.tools_collection.get()
+        results = self.tools_collection.get(limit=limit, include=["documents", "metadatas"])
+        metadatas = [metadata or _EMPTY for metadata in results['metadatas']]
         tools = []
         count = min(limit, len(results['ids']))
         
@@ -88,15 +148,21 @@ class MemoryManager:
             tools.append({
                 'id': results['ids'][i],
                 'content': results['documents'][i],
-                'metadata': results['metadatas'][i] or {}
+                'metadata': metadatas[i]
             })
         
+        buf = []
         for i, tool in enumerate(tools):
-            print(f"\n[{i+1}] ID: {tool['id'][:8]}...")
-            print(f"Content: {tool['content'][:150]}{'...' if len(tool['content']) > 150 else ''}")
+            short_id = tool['id'][:8]
+            content = tool['content']
+            preview = content[:150]
+            buf.append(f"\n[{i+1}] ID: {short_id}...")
+            buf.append(f"Content: {preview}{'...' if len(content) > 150 else ''}")
             metadata = tool['metadata']
             if 'tool_name' in metadata:
-                print(f"Tool: {metadata['tool_name']} ({metadata.get('tool_type', 'unknown')})")
+                buf.append(f"Tool: {metadata['tool_name']} ({metadata.get('tool_type', 'unknown')})")
+        if buf:
+            sys.stdout.write("\n".join(buf) + "\n")
         
         return tools
 
@@ -108,13 +174,35 @@ class MemoryManager:
             documents=[content],
             metadatas=[{"type": memory_type, "source": "manual"}]
         )
+        self._adjust_count(self.memory_collection, 1)
         print(f"Added memory: {memory_id[:8]}... - {content[:50]}{'...' if len(content) > 50 else ''}")
         return memory_id
 
+    def add_memories_bulk(self, items: List[Tuple[str, Dict]]) -> List[str]:
+        """(content, metadata) 목록을 배치 upsert로 한 번에 추가"""
+        memory_ids = [str(uuid.uuid4()) for _ in items]
+        self._upsert_batched(memory_ids, [content for content, _ in items], [metadata for _, metadata in items])
+        self._adjust_count(self.memory_collection, len(memory_ids))
+        print(f"Added {len(memory_ids)} memories")
+        return memory_ids
+
+    def _upsert_batched(self, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        """아이템마다 트랜잭션을 열지 않도록 배치 단위로 upsert"""
+        batch_size = min(UPSERT_BATCH_SIZE, self.client.get_max_batch_size())
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.memory_collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
+
     def delete_memory(self, memory_id: str) -> bool:
         """메모리 삭제"""
         try:
             self.memory_collection.delete(ids=[memory_id])
+            # 없는 ID 삭제는 조용히 무시되므로 증감 대신 캐시를 비움
+            self._invalidate_count(self.memory_collection)
             print(f"Deleted memory: {memory_id[:8]}...")
             return True
         except Exception as e:
@@ -125,6 +213,7 @@ class MemoryManager:
         """도구 메타데이터 삭제"""
         try:
             self.tools_collection.delete(ids=[tool_id])
+            self._invalidate_count(self.tools_collection)
             print(f"Deleted tool: {tool_id[:8]}...")
             return True
         except Exception as e:
@@ -135,9 +224,10 @@ class MemoryManager:
         """모든 도구 메타데이터 삭제"""
         try:
             # Get all tool IDs
-            results = self.tools_collection.get()
+            results = self.tools_collection.get(include=[])
             if results['ids']:
                 self.tools_collection.delete(ids=results['ids'])
+                self._adjust_count(self.tools_collection, -len(results['ids']))
                 print(f"Cleared {len(results['ids'])} tool metadata entries")
             else:
                 print("No tool metadata to clear")
@@ -150,10 +240,12 @@ class MemoryManager:
         """특정 타입의 메모리 모두 삭제"""
         try:
             results = self.memory_collection.get(
-                where={"type": memory_type}
+                where={"type": memory_type},
+                include=[]
             )
             if results['ids']:
                 self.memory_collection.delete(ids=results['ids'])
+                self._adjust_count(self.memory_collection, -len(results['ids']))
                 print(f"Cleared {len(results['ids'])} memories of type '{memory_type}'")
             else:
                 print(f"No memories of type '{memory_type}' found")
@@ -167,49 +259,109 @@ class MemoryManager:
         print(f"\n=== SEARCHING MEMORIES: '{query}' ===")
         return self.list_memories(limit=limit, query=query)
 
-    def export_memories(self, filepath: str = "./memories/memories_export.json") -> bool:
-        """메모리를 JSON으로 내보내기"""
+    def export_memories(self, filepath: str = "./memories/memories_export.jsonl") -> bool:
+        """메모리를 JSONL로 내보내기 (첫 줄은 헤더, 이후 한 줄에 메모리 하나)"""
         try:
-            results = self.memory_collection.get()
-            
-            export_data = {
-                "collection": "neuro_memories",
-                "count": len(results['ids']),
-                "memories": []
-            }
-            
-            for i in range(len(results['ids'])):
-                export_data["memories"].append({
-                    "id": results['ids'][i],
-                    "content": results['documents'][i],
-                    "metadata": results['metadatas'][i] or {}
-                })
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            exported = 0
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps({"collection": self.memory_collection.name, "count": self._count(self.memory_collection)}) + b"\n")
+                
+                # 전체를 한 번에 올리지 않고 페이지 단위로 받아 바로 기록
+                offset = 0
+                while True:
+                    page = self.memory_collection.get(
+                        include=["documents", "metadatas"],
+                        limit=EXPORT_PAGE_SIZE,
+                        offset=offset
+                    )
+                    for memory_id, content, metadata in zip(page['ids'], page['documents'], page['metadatas']):
+                        # _EMPTY(mappingproxy)는 default=dict로 직렬화
+                        f.write(orjson.dumps({"id": memory_id, "content": content, "metadata": metadata or _EMPTY}, default=dict) + b"\n")
+                    exported += len(page['ids'])
+                    if len(page['ids']) < EXPORT_PAGE_SIZE:
+                        break
+                    offset += EXPORT_PAGE_SIZE
             
-            print(f"Exported {len(results['ids'])} memories to {filepath}")
+            print(f"Exported {exported} memories to {filepath}")
             return True
             
         except Exception as e:
             print(f"Failed to export memories: {e}")
             return False
 
+    @contextmanager
+    def _unsafe_bulk_mode(self):
+        """대량 import 동안 ChromaDB SQLite 연결의 저널링/동기화를 끄고 끝나면 원래 값으로 복구
+        
+        chromadb 0.5.x 내부 API(_server._sysdb._conn_pool)에 의존하므로 접근할 수 없으면 그냥 진행
+        """
+        conn = None
+        # 실제로 바꾼 PRAGMA의 원래 값 (중간에 실패해도 여기까지는 복구)
+        saved = {}
+        try:
+            conn = self.client._server._sysdb._conn_pool.connect()
+            for pragma, value in BULK_PRAGMAS.items():
+                old_value = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                conn.execute(f"PRAGMA {pragma}={value}")
+                saved[pragma] = old_value
+        except Exception as e:
+            print(f"Bulk mode unavailable, importing with default SQLite settings: {e}")
+            self._restore_pragmas(conn, saved)
+            saved = {}
+        
+        try:
+            yield
+        finally:
+            self._restore_pragmas(conn, saved)
+
+    @staticmethod
+    def _restore_pragmas(conn, saved):
+        """_unsafe_bulk_mode에서 바꾼 PRAGMA를 원래 값으로 복구"""
+        for pragma, value in saved.items():
+            try:
+                conn.execute(f"PRAGMA {pragma}={value}")
+            except Exception as e:
+                print(f"Failed to restore PRAGMA {pragma}: {e}")
+
     def import_memories(self, filepath: str) -> bool:
-        """JSON에서 메모리 가져오기"""
+        """JSONL(또는 이전 형식의 JSON)에서 메모리 가져오기"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            memories = data.get("memories", [])
-            for memory in memories:
-                self.memory_collection.upsert(
-                    ids=[memory["id"]],
-                    documents=[memory["content"]],
-                    metadatas=[memory.get("metadata", {})]
-                )
+            # 가져오는 동안만 SQLite fsync/저널링을 끔 (도중에 죽으면 다시 import 해야 함)
+            with self._unsafe_bulk_mode():
+                if not filepath.endswith(".jsonl"):
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        memories = json.load(f).get("memories", [])
+                    self._upsert_batched(
+                        [memory["id"] for memory in memories],
+                        [memory["content"] for memory in memories],
+                        [memory.get("metadata", {}) for memory in memories]
+                    )
+                    imported = len(memories)
+                else:
+                    # 한 줄씩 읽어 배치 크기만큼 모이면 upsert
+                    imported = 0
+                    ids, documents, metadatas = [], [], []
+                    with open(filepath, 'rb') as f:
+                        for line in f:
+                            if not line.strip():
+                                continue
+                            memory = orjson.loads(line)
+                            if "id" not in memory:
+                                continue  # 헤더
+                            ids.append(memory["id"])
+                            documents.append(memory["content"])
+                            metadatas.append(memory.get("metadata", {}))
+                            if len(ids) >= UPSERT_BATCH_SIZE:
+                                self._upsert_batched(ids, documents, metadatas)
+                                imported += len(ids)
+                                ids, documents, metadatas = [], [], []
+                    if ids:
+                        self._upsert_batched(ids, documents, metadatas)
+                        imported += len(ids)
+            # 기존 ID를 덮어쓸 수 있으므로 다시 세도록 함
+            self._invalidate_count(self.memory_collection)
             
-            print(f"Imported {len(memories)} memories from {filepath}")
+            print(f"Imported {imported} memories from {filepath}")
             return True
             
         except Exception as e:
@@ -219,18 +371,39 @@ class MemoryManager:
     def stats(self):
         """통계 정보 출력"""
         print("\n=== MEMORY STATISTICS ===")
-        print(f"Conversation Memories: {self.memory_collection.count()}")
-        print(f"Tool Metadata: {self.tools_collection.count()}")
+        print(f"Conversation Memories: {self._count(self.memory_collection)}")
+        print(f"Tool Metadata: {self._count(self.tools_collection)}")
         
-        # 메모리 타입별 통계
+        # 메모리 타입별 통계 (타입 필터는 ChromaDB where로 처리하고 ID만 받아옴)
         try:
-            memory_results = self.memory_collection.get()
+            total = self._count(self.memory_collection)
             type_counts = {}
+            for mem_type in MEMORY_TYPES:
+                count = len(self.memory_collection.get(where={"type": mem_type}, include=[])['ids'])
+                if count:
+                    type_counts[mem_type] = count
+            
+            # 알려지지 않은 타입만 메타데이터를 페이지 단위로 받아 집계
+            offset = 0
+            while True:
+                page = self.memory_collection.get(
+                    where={"type": {"$nin": list(MEMORY_TYPES)}},
+                    include=["metadatas"],
+                    limit=STATS_PAGE_SIZE,
+                    offset=offset
+                )
+                for metadata in page['metadatas']:
+                    if metadata:
+                        mem_type = metadata.get('type', 'unknown')
+                        type_counts[mem_type] = type_counts.get(mem_type, 0) + 1
+                if len(page['ids']) < STATS_PAGE_SIZE:
+                    break
+                offset += STATS_PAGE_SIZE
             
-            for metadata in memory_results['metadatas']:
-                if metadata:
-                    mem_type = metadata.get('type', 'unknown')
-                    type_counts[mem_type] = type_counts.get(mem_type, 0) + 1
+            # type 키가 없는 아이템은 where에 걸리지 않으므로 나머지로 계산
+            untyped = total - sum(type_counts.values())
+            if untyped > 0:
+                type_counts['unknown'] = type_counts.get('unknown', 0) + untyped
             
             print("\nMemory Types:")
             for mem_type, count in type_counts.items():
@@ -240,56 +413,78 @@ class MemoryManager:
             print(f"Failed to get memory type statistics: {e}")
 
 
+def _build_list_parser(parser):
+    parser.add_argument('--limit', type=int, default=20, help='Limit results')
+    parser.add_argument('--query', help='Search query')
+
+
+def _build_add_parser(parser):
+    parser.add_argument('content', help='Memory content')
+    parser.add_argument('--type', default='manual', help='Memory type')
+
+
+def _build_delete_parser(parser):
+    parser.add_argument('id', help='Memory ID')
+
+
+def _build_clear_parser(parser):
+    parser.add_argument('--tools', action='store_true', help='Clear tool metadata')
+    parser.add_argument('--type', help='Clear memories of specific type')
+
+
+def _build_search_parser(parser):
+    parser.add_argument('query', help='Search query')
+    parser.add_argument('--limit', type=int, default=10, help='Limit results')
+
+
+def _build_export_parser(parser):
+    parser.add_argument('--file', default='./memories/memories_export.jsonl', help='Export file')
+
+
+def _build_import_parser(parser):
+    parser.add_argument('file', help='Import file')
+
+
+# 명령 -> (도움말, 인자 파서 구성 함수). 실행할 명령의 파서만 만든다
+COMMANDS = {
+    'list': ('List memories', _build_list_parser),
+    'tools': ('List tool metadata', None),
+    'add': ('Add memory', _build_add_parser),
+    'delete': ('Delete memory', _build_delete_parser),
+    'clear': ('Clear memories', _build_clear_parser),
+    'search': ('Search memories', _build_search_parser),
+    'export': ('Export memories', _build_export_parser),
+    'import': ('Import memories', _build_import_parser),
+    'stats': ('Show statistics', None),
+}
+
+
 def main():
     """CLI 메인 함수"""
-    parser = argparse.ArgumentParser(description="Memory Management Tool")
+    parser = argparse.ArgumentParser(
+        description="Memory Management Tool",
+        add_help=False,
+        epilog="Commands:\n" + "\n".join(f"  {name:<8} {help_text}" for name, (help_text, _) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('-h', '--help', action='store_true', help='show this help message and exit')
     parser.add_argument('--db', default=CHROMA_DB_PATH, help="Database path")
+    parser.add_argument('command', nargs='?', choices=COMMANDS, metavar='command', help='Command to run')
     
-    subparsers = parser.add_subparsers(dest='command', help='Commands')
-    
-    # List commands
-    list_parser = subparsers.add_parser('list', help='List memories')
-    list_parser.add_argument('--limit', type=int, default=20, help='Limit results')
-    list_parser.add_argument('--query', help='Search query')
-    
-    # Tools command
-    subparsers.add_parser('tools', help='List tool metadata')
-    
-    # Add command
-    add_parser = subparsers.add_parser('add', help='Add memory')
-    add_parser.add_argument('content', help='Memory content')
-    add_parser.add_argument('--type', default='manual', help='Memory type')
-    
-    # Delete commands
-    delete_parser = subparsers.add_parser('delete', help='Delete memory')
-    delete_parser.add_argument('id', help='Memory ID')
-    
-    # Clear commands
-    clear_parser = subparsers.add_parser('clear', help='Clear memories')
-    clear_parser.add_argument('--tools', action='store_true', help='Clear tool metadata')
-    clear_parser.add_argument('--type', help='Clear memories of specific type')
-    
-    # Search command
-    search_parser = subparsers.add_parser('search', help='Search memories')
-    search_parser.add_argument('query', help='Search query')
-    search_parser.add_argument('--limit', type=int, default=10, help='Limit results')
-    
-    # Export/Import commands
-    export_parser = subparsers.add_parser('export', help='Export memories')
-    export_parser.add_argument('--file', default='./memories/memories_export.json', help='Export file')
-    
-    import_parser = subparsers.add_parser('import', help='Import memories')
-    import_parser.add_argument('file', help='Import file')
-    
-    # Stats command
-    subparsers.add_parser('stats', help='Show statistics')
-    
-    args = parser.parse_args()
+    args, rest = parser.parse_known_args()
     
     if not args.command:
         parser.print_help()
         return
     
+    help_text, build = COMMANDS[args.command]
+    command_parser = argparse.ArgumentParser(prog=f"{parser.prog} {args.command}", description=help_text)
+    if build:
+        build(command_parser)
+    if args.help:
+        rest.append('-h')
+    command_parser.parse_args(rest, namespace=args)
+    
     manager = MemoryManager(args.db)
     
     if args.command == 'list':
@@ -8,20 +8,73 @@ import psutil
 import time
 import gc
 import os
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Any
 from datetime import datetime
 
+from pollers import get_poller_registry
+
+# 히스토리에 유지하는 데이터포인트 수
+HISTORY_SIZE = 60
+
+# 이 변화량 미만이면 변화 없음으로 보고 샘플링 간격을 늘림
+IDLE_MEMORY_DELTA_MB = 1.0
+IDLE_CPU_DELTA_PERCENT = 1.0
+
+# 상태를 콘솔에 출력하는 간격 (초)
+STATUS_PRINT_INTERVAL = 300
+
+# 대시보드 화면 지우기 + 커서를 맨 위로 (ANSI escape)
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# create_ascii_bar에서 잘라 쓰는 미리 만든 바 문자열 (최대 너비 64)
+_BAR_FULL = "█" * 64
+_BAR_EMPTY = "░" * 64
+
+# psutil.virtual_memory() 결과를 재사용하는 시간 (초)
+SYSTEM_MEMORY_TTL = 5.0
+
+
+def _fmt_ts(t: float, fmt: str = "%H:%M:%S") -> str:
+    """히스토리에 저장한 epoch 초를 표시용 문자열로 변환"""
+    return time.strftime(fmt, time.localtime(t))
+
+
+def tail(history: deque, n: int) -> list:
+    """히스토리 deque의 마지막 n개 (deque는 슬라이싱을 지원하지 않음)"""
+    return list(islice(history, max(0, len(history) - n), None))
+
 
 class SystemMonitor:
     """시스템 리소스 및 스레드 모니터링 클래스"""
     
-    def __init__(self, signals=None, interval: float = 5.0):
+    def __init__(self, signals=None, interval: float = 5.0, full_info_every: int = 12):
         self.signals = signals
         self.interval = interval
         self.process = psutil.Process()
         self.start_time = time.time()
+        self._last_status_print = self.start_time
         self.is_running = False
-        self.monitor_thread = None
+        # 공유 poller 스레드에 등록할 때 쓰는 이름
+        self._poller_name = f"monitor-{id(self)}"
+        
+        # psutil.virtual_memory() 캐시 (SYSTEM_MEMORY_TTL초 동안 재사용)
+        self._system_memory = None
+        self._system_memory_time = 0.0
+        
+        # USS/PSS는 memory_full_info()가 비싸므로 full_info_every 틱마다만 측정
+        self.full_info_every = full_info_every
+        self._tick = 0
+        
+        # 변화가 없으면 샘플링 간격을 늘리고, 변화가 생기면 원래 간격으로 복귀
+        self._current_interval = interval
+        self._backoff_factor = 1.5
+        self._max_interval = 30.0
+        
+        # CPU 사용률은 직전 cpu_times()와의 차이로 직접 계산
+        self._prev_cpu_total = None
+        self._prev_cpu_wall = 0.0
         
         # 통계 데이터
         self.stats = {
@@ -32,12 +85,14 @@ class SystemMonitor:
             "uptime_seconds": 0
         }
         
-        # 히스토리 (최근 60개 데이터포인트)
+        # 히스토리 (최근 60개 데이터포인트, 넘치면 오래된 것부터 자동으로 버림)
         self.history = {
-            "timestamps": [],
-            "memory_usage": [],
-            "thread_counts": [],
-            "cpu_usage": []
+            "timestamps": deque(maxlen=HISTORY_SIZE),
+            "memory_usage": deque(maxlen=HISTORY_SIZE),
+            "thread_counts": deque(maxlen=HISTORY_SIZE),
+            "cpu_usage": deque(maxlen=HISTORY_SIZE),
+            "uss_mb": deque(maxlen=HISTORY_SIZE),
+            "pss_mb": deque(maxlen=HISTORY_SIZE)
         }
     
     def start_monitoring(self):
@@ -47,62 +102,92 @@ class SystemMonitor:
             return
         
         self.is_running = True
-        self.monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
-        self.monitor_thread.start()
+        self._current_interval = self.interval
+        # 전용 스레드 대신 공유 poller 스레드에서 _current_interval마다 실행
+        get_poller_registry().register(self._poller_name, self._poll, lambda: self._current_interval)
         print("[MONITOR] Started system monitoring")
     
     def stop_monitoring(self):
         """모니터링 중지"""
         self.is_running = False
-        if self.monitor_thread and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=2.0)
+        get_poller_registry().unregister(self._poller_name)
         print("[MONITOR] Stopped system monitoring")
     
-    def _monitoring_loop(self):
-        """모니터링 메인 루프"""
-        while self.is_running:
-            try:
-                self._collect_metrics()
-                time.sleep(self.interval)
-            except Exception as e:
-                print(f"[MONITOR] Error in monitoring loop: {e}")
-                time.sleep(1.0)
+    def _poll(self):
+        """poller 스레드에서 호출되는 한 번의 모니터링 틱"""
+        try:
+            self._collect_metrics()
+            self._update_interval()
+        except Exception as e:
+            print(f"[MONITOR] Error in monitoring loop: {e}")
+    
+    def _update_interval(self):
+        """직전 샘플과 비교해 다음 샘플링 간격 결정"""
+        memory, threads, cpu = self.history["memory_usage"], self.history["thread_counts"], self.history["cpu_usage"]
+        if len(memory) < 2:
+            return
+        
+        idle = (abs(memory[-1] - memory[-2]) < IDLE_MEMORY_DELTA_MB
+                and threads[-1] == threads[-2]
+                and abs(cpu[-1] - cpu[-2]) < IDLE_CPU_DELTA_PERCENT)
+        if idle:
+            self._current_interval = min(self._current_interval * self._backoff_factor, self._max_interval)
+        else:
+            self._current_interval = self.interval
+    
+    def _cpu_percent_from_times(self, cpu_times) -> float:
+        """직전 샘플 이후의 CPU 사용률 (psutil cpu_percent와 같이 코어 하나 = 100%)"""
+        total = cpu_times.user + cpu_times.system
+        now = time.monotonic()
+        prev_total, prev_wall = self._prev_cpu_total, self._prev_cpu_wall
+        self._prev_cpu_total, self._prev_cpu_wall = total, now
+        if prev_total is None:
+            return 0.0
+        return max(0.0, (total - prev_total) / max(now - prev_wall, 1e-6) * 100)
     
     def _collect_metrics(self):
         """메트릭 수집"""
         current_time = time.time()
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # 메모리 사용량
-        memory_info = self.process.memory_info()
-        memory_mb = memory_info.rss / 1024 / 1024
-        
-        # CPU 사용률
-        cpu_percent = self.process.cpu_percent()
         
-        # 스레드 정보
-        thread_count = self.process.num_threads()
-        active_threads = threading.enumerate()
+        # /proc 읽기를 한 번으로 묶어서 조회
+        with self.process.oneshot():
+            # 메모리 사용량 (N틱마다 USS/PSS까지 포함한 memory_full_info 사용)
+            full_info = None
+            if self._tick % self.full_info_every == 0:
+                try:
+                    full_info = self.process.memory_full_info()
+                except psutil.Error:
+                    pass
+            self._tick += 1
+            memory_info = full_info or self.process.memory_info()
+            memory_mb = memory_info.rss / 1024 / 1024
+            
+            # CPU 사용률 (oneshot 안에서 읽은 cpu_times로 계산)
+            cpu_percent = self._cpu_percent_from_times(self.process.cpu_times())
+            
+            # 스레드 정보
+            thread_count = self.process.num_threads()
         
         # 통계 업데이트
         self.stats["peak_memory_mb"] = max(self.stats["peak_memory_mb"], memory_mb)
         self.stats["peak_thread_count"] = max(self.stats["peak_thread_count"], thread_count)
         self.stats["uptime_seconds"] = current_time - self.start_time
         
-        # 히스토리 업데이트 (최근 60개만 유지)
-        self.history["timestamps"].append(timestamp)
+        # 히스토리 업데이트 (deque maxlen으로 최근 60개만 유지)
+        self.history["timestamps"].append(int(current_time))  # 표시할 때 _fmt_ts로 변환
         self.history["memory_usage"].append(memory_mb)
         self.history["thread_counts"].append(thread_count)
         self.history["cpu_usage"].append(cpu_percent)
-        
-        # 최근 60개 데이터만 유지
-        for key in self.history:
-            if len(self.history[key]) > 60:
-                self.history[key] = self.history[key][-60:]
+        if full_info is not None:
+            self.history["uss_mb"].append(full_info.uss / 1024 / 1024)
+            # PSS는 Linux에서만 제공
+            if hasattr(full_info, "pss"):
+                self.history["pss_mb"].append(full_info.pss / 1024 / 1024)
         
         # 콘솔 출력 (5분마다)
-        if int(current_time) % 300 == 0:  # 5분마다
+        if current_time - self._last_status_print >= STATUS_PRINT_INTERVAL:
             self._print_status()
+            self._last_status_print = current_time
     
     def _print_status(self):
         """현재 상태 출력"""
@@ -118,50 +203,62 @@ class SystemMonitor:
     
     def get_detailed_thread_info(self) -> List[Dict[str, Any]]:
         """상세 스레드 정보 조회"""
-        threads = []
-        for thread in threading.enumerate():
-            thread_info = {
+        main = threading.main_thread()
+        threads = [
+            {
                 "name": thread.name,
                 "ident": thread.ident,
                 "is_alive": thread.is_alive(),
                 "daemon": thread.daemon,
-                "is_main": thread == threading.main_thread()
+                "is_main": thread is main
             }
-            threads.append(thread_info)
+            for thread in threading.enumerate()
+        ]
         
         return threads
     
-    def get_memory_breakdown(self) -> Dict[str, float]:
-        """메모리 사용량 세부 정보"""
-        memory_info = self.process.memory_info()
+    def get_memory_breakdown(self, memory_info=None) -> Dict[str, float]:
+        """메모리 사용량 세부 정보 (이미 조회한 memory_info가 있으면 재사용)"""
+        if memory_info is None:
+            memory_info = self.process.memory_info()
+        
+        # 시스템 메모리는 자주 바뀌지 않으므로 일정 시간 동안 재사용
+        now = time.time()
+        if self._system_memory is None or now - self._system_memory_time >= SYSTEM_MEMORY_TTL:
+            self._system_memory = psutil.virtual_memory()
+            self._system_memory_time = now
+        system_memory = self._system_memory
         
         return {
             "rss_mb": memory_info.rss / 1024 / 1024,  # 실제 메모리
             "vms_mb": memory_info.vms / 1024 / 1024,  # 가상 메모리
-            "percent": self.process.memory_percent(),
-            "available_system_mb": psutil.virtual_memory().available / 1024 / 1024
+            "percent": memory_info.rss / system_memory.total * 100,  # memory_percent()와 같은 계산
+            "available_system_mb": system_memory.available / 1024 / 1024,
+            # 마지막 memory_full_info 측정값 (아직 없거나 지원하지 않으면 None)
+            "uss_mb": self.history["uss_mb"][-1] if self.history["uss_mb"] else None,
+            "pss_mb": self.history["pss_mb"][-1] if self.history["pss_mb"] else None
         }
     
-    def force_garbage_collection(self) -> Dict[str, int]:
+    def force_garbage_collection(self) -> Dict[str, Any]:
         """가비지 컬렉션 강제 실행"""
         print("[MONITOR] Running garbage collection...")
         
-        collected = {
-            "generation_0": gc.collect(0),
-            "generation_1": gc.collect(1), 
-            "generation_2": gc.collect(2)
-        }
-        
-        total_collected = sum(collected.values())
+        # gc.collect()는 전체 세대를 한 번에 수집 (세대별로 따로 돌리면 0/1세대를 여러 번 훑음)
+        before = gc.get_count()
+        total_collected = gc.collect()
+        after = gc.get_count()
         self.stats["total_gc_collections"] += total_collected
         
         print(f"[MONITOR] Collected {total_collected} objects")
-        return collected
+        return {"collected": total_collected, "before": before, "after": after}
     
     def get_system_summary(self) -> Dict[str, Any]:
         """시스템 요약 정보"""
+        memory_info = self.process.memory_info()
+        # 모니터링 루프가 마지막으로 계산한 값 사용 (cpu_percent() 호출 시 루프의 기준점이 바뀜)
+        cpu_percent = self.history["cpu_usage"][-1] if self.history["cpu_usage"] else 0.0
         threads = self.get_detailed_thread_info()
-        memory = self.get_memory_breakdown()
+        memory = self.get_memory_breakdown(memory_info)
         
         return {
             "timestamp": datetime.now().isoformat(),
@@ -175,12 +272,12 @@ class SystemMonitor:
             "performance": {
                 "peak_memory_mb": self.stats["peak_memory_mb"],
                 "total_gc_collections": self.stats["total_gc_collections"],
-                "cpu_percent": self.process.cpu_percent()
+                "cpu_percent": cpu_percent
             },
             "recent_history": {
-                "memory_trend": self.history["memory_usage"][-10:],
-                "thread_trend": self.history["thread_counts"][-10:],
-                "cpu_trend": self.history["cpu_usage"][-10:]
+                "memory_trend": tail(self.history["memory_usage"], 10),
+                "thread_trend": tail(self.history["thread_counts"], 10),
+                "cpu_trend": tail(self.history["cpu_usage"], 10)
             }
         }
     
@@ -199,6 +296,10 @@ class SystemMonitor:
         print(f"Current Usage: {mem['rss_mb']:.1f} MB ({mem['percent']:.1f}%)")
         print(f"Peak Usage: {summary['performance']['peak_memory_mb']:.1f} MB")
         print(f"Virtual Memory: {mem['vms_mb']:.1f} MB")
+        if mem['uss_mb'] is not None:
+            print(f"Unique (USS): {mem['uss_mb']:.1f} MB")
+        if mem['pss_mb'] is not None:
+            print(f"Proportional (PSS): {mem['pss_mb']:.1f} MB")
         print(f"System Available: {mem['available_system_mb']:.1f} MB")
         
         print(f"\n--- THREADS ---")
@@ -222,7 +323,7 @@ class SystemMonitor:
         history = summary['recent_history']
         print(f"Memory: {' → '.join([f'{x:.0f}' for x in history['memory_trend']])}")
         print(f"Threads: {' → '.join([str(x) for x in history['thread_trend']])}")
-        print(f"CPU: {' → '.join([f'{x:.0f}%' for x in history['cpu_usage']])}")
+        print(f"CPU: {' → '.join([f'{x:.0f}%' for x in history['cpu_trend']])}")
         print(f"{'='*60}\n")
 
 
@@ -262,7 +363,7 @@ def cleanup_system():
     """시스템 정리"""
     monitor = get_system_monitor()
     collected = monitor.force_garbage_collection()
-    print(f"[MONITOR] System cleanup completed: {sum(collected.values())} objects collected")
+    print(f"[MONITOR] System cleanup completed: {collected['collected']} objects collected")
 
 def interactive_monitor():
     """심플 인터랙티브 모니터링 모드"""
@@ -283,7 +384,7 @@ def interactive_monitor():
                 memory = monitor.history["memory_usage"][-1]
                 threads = monitor.history["thread_counts"][-1] 
                 cpu = monitor.history["cpu_usage"][-1]
-                timestamp = monitor.history["timestamps"][-1]
+                timestamp = _fmt_ts(monitor.history["timestamps"][-1])
                 
                 print(f"[{timestamp}] Memory: {memory:6.1f}MB | Threads: {threads:2d} | CPU: {cpu:5.1f}% | Update #{counter}")
                 
@@ -296,7 +397,7 @@ def interactive_monitor():
                 # 매 30회마다 가비지 컬렉션
                 if counter % 30 == 0:
                     collected = monitor.force_garbage_collection()
-                    print(f"🧹 Auto cleanup: {sum(collected.values())} objects collected")
+                    print(f"🧹 Auto cleanup: {collected['collected']} objects collected")
                     print("-" * 60)
             
             time.sleep(2.0)
@@ -312,21 +413,28 @@ def interactive_monitor():
 def dashboard_monitor():
     """대시보드 스타일 모니터링"""
     import os
+    import sys
+    
+    # Windows 콘솔에서 ANSI escape(VT) 처리를 켜기 위해 한 번만 실행
+    if os.name == 'nt':
+        os.system('')
     
     monitor = SystemMonitor(interval=2.0)
     monitor.start_monitoring()
     
+    # 시스템 총 메모리는 바뀌지 않으므로 한 번만 조회
+    total_memory_mb = psutil.virtual_memory().total / 1024 / 1024
+    
     try:
         while True:
-            # 화면 지우기
-            os.system('cls' if os.name == 'nt' else 'clear')
+            # 화면 지우기 (clear 프로세스를 띄우지 않고 ANSI escape로 지우고 커서를 맨 위로)
+            lines = [CLEAR_SCREEN + "🖥️  SYSTEM MONITOR DASHBOARD"]
             
             # 헤더
-            print("🖥️  SYSTEM MONITOR DASHBOARD")
-            print("=" * 60)
-            print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"Uptime: {monitor.stats['uptime_seconds']/3600:.2f} hours")
-            print()
+            lines.append("=" * 60)
+            lines.append(f"Time: {_fmt_ts(time.time(), '%Y-%m-%d %H:%M:%S')}")
+            lines.append(f"Uptime: {monitor.stats['uptime_seconds']/3600:.2f} hours")
+            lines.append("")
             
             # 현재 상태
             if monitor.history["memory_usage"]:
@@ -334,40 +442,41 @@ def dashboard_monitor():
                 threads = monitor.history["thread_counts"][-1]
                 cpu = monitor.history["cpu_usage"][-1]
                 
-                # 시스템 총 메모리 정보
-                total_memory_mb = psutil.virtual_memory().total / 1024 / 1024
-                
                 # 메모리 바 (시스템 총 메모리 대비)
                 memory_bar = create_ascii_bar(memory, total_memory_mb, 30)
-                print(f"💾 Memory:  {memory:6.1f} MB {memory_bar} / {total_memory_mb:.0f}MB")
+                lines.append(f"💾 Memory:  {memory:6.1f} MB {memory_bar} / {total_memory_mb:.0f}MB")
                 
                 # 스레드 바 (일반적인 최대 스레드 수 기준: 50개)
                 thread_bar = create_ascii_bar(threads, 50, 30)
-                print(f"🧵 Threads: {threads:6d}    {thread_bar} Peak: {monitor.stats['peak_thread_count']}")
+                lines.append(f"🧵 Threads: {threads:6d}    {thread_bar} Peak: {monitor.stats['peak_thread_count']}")
                 
                 # CPU 바
                 cpu_bar = create_ascii_bar(cpu, 100, 30)
-                print(f"⚡ CPU:     {cpu:6.1f} %  {cpu_bar}")
+                lines.append(f"⚡ CPU:     {cpu:6.1f} %  {cpu_bar}")
                 
-                print()
+                lines.append("")
                 
                 # 트렌드 (최근 10개)
                 if len(monitor.history["memory_usage"]) >= 10:
-                    print("📈 Memory Trend (MB):")
-                    memory_trend = monitor.history["memory_usage"][-10:]
-                    print("   " + " ".join([f"{x:4.0f}" for x in memory_trend]))
+                    lines.append("📈 Memory Trend (MB):")
+                    memory_trend = tail(monitor.history["memory_usage"], 10)
+                    lines.append("   " + " ".join([f"{x:4.0f}" for x in memory_trend]))
                     
-                    print("📊 Thread Trend:")
-                    thread_trend = monitor.history["thread_counts"][-10:]
-                    print("   " + " ".join([f"{x:4d}" for x in thread_trend]))
+                    lines.append("📊 Thread Trend:")
+                    thread_trend = tail(monitor.history["thread_counts"], 10)
+                    lines.append("   " + " ".join([f"{x:4d}" for x in thread_trend]))
                     
-                    print("🔥 CPU Trend (%):")
-                    cpu_trend = monitor.history["cpu_usage"][-10:]
-                    print("   " + " ".join([f"{x:4.0f}" for x in cpu_trend]))
+                    lines.append("🔥 CPU Trend (%):")
+                    cpu_trend = tail(monitor.history["cpu_usage"], 10)
+                    lines.append("   " + " ".join([f"{x:4.0f}" for x in cpu_trend]))
+            
+            lines.append("")
+            lines.append("=" * 60)
+            lines.append("Press Ctrl+C to exit")
             
-            print()
-            print("=" * 60)
-            print("Press Ctrl+C to exit")
+            # 한 프레임을 한 번에 출력
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
             
             time.sleep(2.0)
             
@@ -386,7 +495,7 @@ def create_ascii_bar(value: float, max_value: float, width: int = 30) -> str:
         percentage = min(value / max_value, 1.0)
     
     filled = int(percentage * width)
-    bar = "█" * filled + "░" * (width - filled)
+    bar = _BAR_FULL[:filled] + _BAR_EMPTY[:width - filled]
     return f"[{bar}] {percentage*100:5.1f}%"
 
 
@@ -0,0 +1,88 @@
+"""
+Pollers - 주기 작업을 스레드 하나에서 실행하는 공유 스케줄러
+"""
+
+import sched
+import threading
+import time
+
+
+class PollerRegistry:
+    """여러 주기 작업(모니터 등)을 데몬 스레드 하나의 sched.scheduler로 실행
+
+    작업마다 스레드를 두고 sleep하는 대신 깨어나는 시점을 공유한다.
+    """
+
+    def __init__(self):
+        self._scheduler = sched.scheduler(time.monotonic, self._delay)
+        # 새 작업이 등록되면 대기 중인 스레드를 깨움
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        # 이름 -> 등록 토큰 (해제 후 같은 이름으로 다시 등록해도 이전 작업은 재예약되지 않음)
+        self._tokens = {}
+        self._events = {}
+        self._thread = None
+
+    def register(self, name, callback, interval):
+        """callback을 바로 한 번 실행하고 이후 interval초마다 실행
+
+        interval은 숫자 또는 다음 간격을 돌려주는 함수 (적응형 간격용)
+        """
+        self.unregister(name)
+        token = object()
+        with self._lock:
+            self._tokens[name] = token
+            self._events[name] = self._scheduler.enter(0, 0, self._run, (name, token, callback, interval))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="pollers", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def unregister(self, name):
+        """등록된 작업 해제 (실행 중이면 이번 실행 후 재예약하지 않음)"""
+        with self._lock:
+            self._tokens.pop(name, None)
+            event = self._events.pop(name, None)
+        if event is not None:
+            try:
+                self._scheduler.cancel(event)
+            except ValueError:
+                # 이미 실행 중이라 큐에 없음
+                pass
+
+    def _run(self, name, token, callback, interval):
+        try:
+            callback()
+        except Exception as e:
+            print(f"[POLLERS] Error in {name}: {e}")
+
+        delay = interval() if callable(interval) else interval
+        with self._lock:
+            if self._tokens.get(name) is token:
+                self._events[name] = self._scheduler.enter(delay, 0, self._run, (name, token, callback, interval))
+
+    def _delay(self, seconds):
+        # 새 작업이 등록되면 일찍 깨어나서 큐를 다시 확인
+        if seconds > 0:
+            self._wakeup.wait(seconds)
+            self._wakeup.clear()
+
+    def _loop(self):
+        while True:
+            self._scheduler.run()
+            # 큐가 비면 다음 등록까지 대기
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+
+# 전역 레지스트리 인스턴스
+_global_registry = None
+_global_registry_lock = threading.Lock()
+
+def get_poller_registry() -> PollerRegistry:
+    """전역 PollerRegistry 인스턴스 가져오기"""
+    global _global_registry
+    with _global_registry_lock:
+        if _global_registry is None:
+            _global_registry = PollerRegistry()
+        return _global_registry
@@ -1,6 +1,9 @@
 import time
 from constants import PATIENCE
 
+# Minimum seconds between patience_update events
+PATIENCE_EMIT_INTERVAL = 0.5
+
 
 class Prompter:
     def __init__(self, signals, llms, modules=None):
@@ -13,6 +16,7 @@ class Prompter:
 
         self.system_ready = False
         self.timeSinceLastMessage = 0.0
+        self._last_patience_emit = 0.0
         
         # For hybrid tool execution
         self.pending_tool_future = None
@@ -46,9 +50,12 @@ class Prompter:
         print("Prompter loop started")
 
         while not self.signals.terminate:
+            # last_message_time is a monotonic timestamp, wall clock jumps must not change the patience timer
+            now = time.monotonic()
+
             # Set lastMessageTime to now if program is still starting
             if self.signals.last_message_time == 0.0 or (not self.signals.stt_ready or not self.signals.tts_ready):
-                self.signals.last_message_time = time.time()
+                self.signals.last_message_time = now
                 self.timeSinceLastMessage = 0.0
             else:
                 if not self.system_ready:
@@ -56,26 +63,26 @@ class Prompter:
                     self.system_ready = True
 
             # Calculate and set time since last message
-            self.timeSinceLastMessage = time.time() - self.signals.last_message_time
-            self.signals.sio_queue.put(("patience_update", {"crr_time": self.timeSinceLastMessage, "total_time": PATIENCE}))
+            self.timeSinceLastMessage = now - self.signals.last_message_time
+            # The loop ticks every 0.1s, the UI only needs the patience bar a couple of times per second
+            if now - self._last_patience_emit > PATIENCE_EMIT_INTERVAL:
+                self.signals.sio_queue.coalesce_put("patience_update", {"crr_time": self.timeSinceLastMessage, "total_time": PATIENCE})
+                self._last_patience_emit = now
 
             # Check if previous tool execution completed
             if self.pending_tool_future and self.pending_tool_future.done():
                 try:
                     result = self.pending_tool_future.result()
                     print(f"[TOOL LLM] Tool execution completed: {result is not None}")
-                    # Clean up executor
-                    if hasattr(self.pending_tool_future, 'executor'):
-                        self.pending_tool_future.executor.shutdown(wait=False)
                 except Exception as e:
                     print(f"[TOOL LLM] Tool execution error: {e}")
                 finally:
                     self.pending_tool_future = None
 
             # Check if toolLLM needs to be triggered by TOOL_TRIGGER token
-            if hasattr(self.signals, 'tool_execution_needed') and self.signals.tool_execution_needed:
+            if self.signals.tool_execution_needed:
                 if "tool" in self.llms and self.pending_tool_future is None:
-                    tool_request = getattr(self.signals, 'tool_trigger_request', '')
+                    tool_request = self.signals.tool_trigger_request
                     print(f"[TOOL LLM] Executing tools for request: {tool_request}")
                     self.pending_tool_future = self.llms["tool"].prompt_async()
                     self.signals.tool_execution_needed = False
@@ -89,7 +96,7 @@ class Prompter:
                 llmWrapper = self.chooseLLM()
                 llmWrapper.prompt()
                 
-                self.signals.last_message_time = time.time()
+                self.signals.last_message_time = time.monotonic()
 
             # Sleep for 0.1 seconds before checking again.
             time.sleep(0.1)
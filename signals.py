@@ -1,199 +1,195 @@
+import os
 import queue
+import threading
+from collections import deque
+
+
+# 상태 변경 로그 출력 여부 (NEURO_SIGNAL_DEBUG=1일 때만 출력)
+_DEBUG = os.environ.get('NEURO_SIGNAL_DEBUG') == '1'
+
+# 값이 바뀔 때 sio_queue로 알리는 필드: 이름 -> (sio 이벤트, 시작 로그, 종료 로그)
+# 이벤트가 None이면 로그만, 로그가 None이면 이벤트만 보냄
+_NOTIFY_FIELDS = {
+    "human_speaking": ("human_speaking", "Human Talking Start", "Human Talking Stop"),
+    "AI_speaking": ("AI_speaking", "AI Talking Start", "AI Talking Stop"),
+    "AI_thinking": ("AI_thinking", "AI Thinking Start", "AI Thinking Stop"),
+    "new_message": (None, "New Message", None),
+    "recentTwitchMessages": ("recent_twitch_messages", None, None),
+    # 개별 LLM 상태
+    "text_llm_thinking": ("text_llm_thinking", "Text LLM Thinking Start", "Text LLM Thinking Stop"),
+    "tool_llm_thinking": ("tool_llm_thinking", "Tool LLM Thinking Start", "Tool LLM Thinking Stop"),
+    "image_llm_thinking": ("image_llm_thinking", "Image LLM Thinking Start", "Image LLM Thinking Stop"),
+}
+
+# 바뀌면 통합 AI_thinking 상태를 다시 계산하는 필드
+_LLM_THINKING_FIELDS = frozenset(("text_llm_thinking", "tool_llm_thinking", "image_llm_thinking"))
+
+SIO_QUEUE_CAPACITY = 1024
+
+
+class EventRing:
+    """여러 스레드가 쓰고 하나가 읽는 sio 이벤트 링 버퍼
+
+    deque의 append/popleft는 GIL 아래에서 원자적이라 락 없이 동작한다.
+    가득 차면 가장 오래된 이벤트부터 버림 (로그 방식).
+    coalesce_put으로 넣은 이벤트는 최신 값만 남아서 다음 drain 때 한 번만 전달됨.
+    """
+
+    def __init__(self, capacity=SIO_QUEUE_CAPACITY):
+        self._buf = deque(maxlen=capacity)
+        # 이벤트 이름 -> 최신 값 (latest-wins 이벤트)
+        self._latest = {}
+
+    def put(self, item):
+        self._buf.append(item)
+
+    def coalesce_put(self, event, value):
+        """아직 전달되지 않은 같은 이벤트가 있으면 값만 덮어씀 (진행률 등 최신 값만 의미 있는 이벤트용)"""
+        self._latest[event] = value
+
+    def get(self):
+        try:
+            return self._buf.popleft()
+        except IndexError:
+            pass
+        try:
+            return self._latest.popitem()
+        except KeyError:
+            raise queue.Empty from None
+
+    def empty(self):
+        return not self._buf and not self._latest
+
+    def qsize(self):
+        return len(self._buf) + len(self._latest)
+
+    def drain(self):
+        """지금 쌓여 있는 이벤트를 모두 꺼냄 (다른 소비자와 경쟁해도 안전)"""
+        items = []
+        pop = self._buf.popleft
+        for _ in range(len(self._buf)):
+            try:
+                items.append(pop())
+            except IndexError:
+                break
+        # popitem은 원자적이라 그 사이에 덮어쓴 값은 다음 drain에서 전달됨
+        latest = self._latest
+        while latest:
+            try:
+                items.append(latest.popitem())
+            except KeyError:
+                break
+        return items
 
 
 class Signals:
-    def __init__(self):
-        # 기존 통합 상태 (하위 호환성)
-        self._human_speaking = False
-        self._AI_speaking = False
-        self._AI_thinking = False
-        
-        # 개별 LLM 상태
-        self._text_llm_thinking = False
-        self._tool_llm_thinking = False
-        self._image_llm_thinking = False
-        
-        self._last_message_time = 0.0
-        self._new_message = False
-        self._tts_ready = False
-        self._stt_ready = False
-        self._recentTwitchMessages = []
-        self._history = []
-
-        # This flag indicates to all threads that they should immediately terminate
-        self._terminate = False
+    """스레드 간 공유 상태
 
-        self.sio_queue = queue.SimpleQueue()
+    모든 상태는 일반 속성이라 읽기에 property 호출 비용이 없다.
+    _NOTIFY_FIELDS에 있는 필드에 값을 쓰면 __setattr__에서 sio_queue 이벤트와 로그를 보낸다.
+    """
 
-    @property
-    def human_speaking(self):
-        return self._human_speaking
+    def __init__(self):
+        self.sio_queue = EventRing()
+        # batch_update 중인 스레드는 이벤트를 여기에 모았다가 한 번에 보냄
+        self._local = threading.local()
+
+        # 알림 필드의 초기값은 이벤트로 보내지 않도록 __setattr__을 거치지 않고 설정
+        self.__dict__.update(
+            # 기존 통합 상태 (하위 호환성)
+            human_speaking=False,
+            AI_speaking=False,
+            AI_thinking=False,
+            # 개별 LLM 상태
+            text_llm_thinking=False,
+            tool_llm_thinking=False,
+            image_llm_thinking=False,
+            new_message=False,
+            recentTwitchMessages=[],
+        )
+
+        self.last_message_time = 0.0
+        self.tts_ready = False
+        self.stt_ready = False
+        self.history = []
+
+        # Tool LLM hand-off, set by the text LLM when it emits a TOOL_TRIGGER token
+        self.tool_trigger_request = ""
+        self.tool_execution_needed = False
+        self.tool_results = []
+        # Set by main once the WebSocket server exists
+        self.ws_server = None
 
-    @human_speaking.setter
-    def human_speaking(self, value):
-        self._human_speaking = value
-        self.sio_queue.put(('human_speaking', value))
-        if value:
-            print("SIGNALS: Human Talking Start")
-        else:
-            print("SIGNALS: Human Talking Stop")
-
-    @property
-    def AI_speaking(self):
-        return self._AI_speaking
-
-    @AI_speaking.setter
-    def AI_speaking(self, value):
-        self._AI_speaking = value
-        self.sio_queue.put(('AI_speaking', value))
-        if value:
-            print("SIGNALS: AI Talking Start")
-        else:
-            print("SIGNALS: AI Talking Stop")
-
-    @property
-    def AI_thinking(self):
-        return self._AI_thinking
-
-    @AI_thinking.setter
-    def AI_thinking(self, value):
-        self._AI_thinking = value
-        self.sio_queue.put(('AI_thinking', value))
-        if value:
-            print("SIGNALS: AI Thinking Start")
-        else:
-            print("SIGNALS: AI Thinking Stop")
-
-    @property
-    def last_message_time(self):
-        return self._last_message_time
-
-    @last_message_time.setter
-    def last_message_time(self, value):
-        self._last_message_time = value
-
-    @property
-    def new_message(self):
-        return self._new_message
-
-    @new_message.setter
-    def new_message(self, value):
-        self._new_message = value
-        if value:
-            print("SIGNALS: New Message")
-
-    @property
-    def tts_ready(self):
-        return self._tts_ready
-
-    @tts_ready.setter
-    def tts_ready(self, value):
-        self._tts_ready = value
-
-    @property
-    def stt_ready(self):
-        return self._stt_ready
-
-    @stt_ready.setter
-    def stt_ready(self, value):
-        self._stt_ready = value
-
-    @property
-    def recentTwitchMessages(self):
-        return self._recentTwitchMessages
-
-    @recentTwitchMessages.setter
-    def recentTwitchMessages(self, value):
-        self._recentTwitchMessages = value
-        self.sio_queue.put(('recent_twitch_messages', value))
-
-    @property
-    def history(self):
-        return self._history
-
-    @history.setter
-    def history(self, value):
-        self._history = value
-
-    @property
-    def terminate(self):
-        return self._terminate
-
-    @terminate.setter
-    def terminate(self, value):
-        self._terminate = value
-
-    # 개별 LLM 상태 관리
-    @property
-    def text_llm_thinking(self):
-        return self._text_llm_thinking
-
-    @text_llm_thinking.setter
-    def text_llm_thinking(self, value):
-        self._text_llm_thinking = value
-        self.sio_queue.put(('text_llm_thinking', value))
-        if value:
-            print("SIGNALS: Text LLM Thinking Start")
-        else:
-            print("SIGNALS: Text LLM Thinking Stop")
-        self._update_combined_thinking()
-
-    @property
-    def tool_llm_thinking(self):
-        return self._tool_llm_thinking
-
-    @tool_llm_thinking.setter
-    def tool_llm_thinking(self, value):
-        self._tool_llm_thinking = value
-        self.sio_queue.put(('tool_llm_thinking', value))
-        if value:
-            print("SIGNALS: Tool LLM Thinking Start")
-        else:
-            print("SIGNALS: Tool LLM Thinking Stop")
-        self._update_combined_thinking()
-
-    @property
-    def image_llm_thinking(self):
-        return self._image_llm_thinking
-
-    @image_llm_thinking.setter
-    def image_llm_thinking(self, value):
-        self._image_llm_thinking = value
-        self.sio_queue.put(('image_llm_thinking', value))
-        if value:
-            print("SIGNALS: Image LLM Thinking Start")
+        # This flag indicates to all threads that they should immediately terminate
+        self.terminate = False
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        notify = _NOTIFY_FIELDS.get(name)
+        if notify is None:
+            return
+
+        event, start_log, stop_log = notify
+        if event is not None:
+            self._emit(event, value)
+        if _DEBUG:
+            log = start_log if value else stop_log
+            if log is not None:
+                print(f"SIGNALS: {log}")
+        if name in _LLM_THINKING_FIELDS and not self._in_batch():
+            self._update_combined_thinking()
+
+    def _emit(self, event, value):
+        """sio_queue로 이벤트 전송 (batch_update 중이면 모아둠)"""
+        pending = getattr(self._local, "batch", None)
+        if pending is not None:
+            pending[event] = value
         else:
-            print("SIGNALS: Image LLM Thinking Stop")
-        self._update_combined_thinking()
+            self.sio_queue.put((event, value))
+
+    def batch_update(self, **kwargs):
+        """여러 상태를 한 번에 바꾸고 sio_queue에는 ('state_batch', {event: value}) 하나만 보냄"""
+        pending = self._local.batch = {}
+        try:
+            for name, value in kwargs.items():
+                setattr(self, name, value)
+            # 개별 LLM 상태가 모두 반영된 뒤에 통합 상태를 한 번만 계산
+            self._update_combined_thinking()
+        finally:
+            self._local.batch = None
+        if pending:
+            self.sio_queue.put(('state_batch', pending))
+
+    def _in_batch(self):
+        return getattr(self._local, "batch", None) is not None
 
     def _update_combined_thinking(self):
         """개별 LLM 상태를 기반으로 통합 AI_thinking 상태 업데이트"""
-        new_thinking = (self._text_llm_thinking or 
-                       self._tool_llm_thinking or 
-                       self._image_llm_thinking)
-        
-        if new_thinking != self._AI_thinking:
-            self._AI_thinking = new_thinking
-            self.sio_queue.put(('AI_thinking', new_thinking))
-            if new_thinking:
-                print("SIGNALS: AI Thinking Start (Combined)")
-            else:
-                print("SIGNALS: AI Thinking Stop (Combined)")
+        new_thinking = (self.text_llm_thinking or
+                        self.tool_llm_thinking or
+                        self.image_llm_thinking)
+
+        if new_thinking != self.AI_thinking:
+            # AI_thinking 알림 대신 (Combined) 로그로 직접 전송
+            object.__setattr__(self, "AI_thinking", new_thinking)
+            self._emit('AI_thinking', new_thinking)
+            if _DEBUG:
+                print(f"SIGNALS: AI Thinking {'Start' if new_thinking else 'Stop'} (Combined)")
 
     def get_thinking_status(self):
         """현재 thinking 상태 요약"""
         active = []
-        if self._text_llm_thinking:
+        if self.text_llm_thinking:
             active.append("text")
-        if self._tool_llm_thinking:
+        if self.tool_llm_thinking:
             active.append("tool")
-        if self._image_llm_thinking:
+        if self.image_llm_thinking:
             active.append("image")
-        
+
         return {
-            "combined": self._AI_thinking,
+            "combined": self.AI_thinking,
             "active_llms": active,
-            "text": self._text_llm_thinking,
-            "tool": self._tool_llm_thinking,
-            "image": self._image_llm_thinking
+            "text": self.text_llm_thinking,
+            "tool": self.tool_llm_thinking,
+            "image": self.image_llm_thinking
         }
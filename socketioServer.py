@@ -194,7 +194,7 @@ class SocketIOServer:
             self.signals.AI_speaking = self.signals.AI_speaking
             self.signals.human_speaking = self.signals.human_speaking
             self.signals.recentTwitchMessages = self.signals.recentTwitchMessages
-            await sio.emit("patience_update", {"crr_time": time.time() - self.signals.last_message_time, "total_time": PATIENCE})
+            await sio.emit("patience_update", {"crr_time": time.monotonic() - self.signals.last_message_time, "total_time": PATIENCE})
             await sio.emit('get_blacklist', self.llmWrapper.API.get_blacklist())
 
             if "twitch" in self.modules:
@@ -223,10 +223,14 @@ class SocketIOServer:
                 if self.signals.terminate:
                     raise GracefulExit
 
-                while not self.signals.sio_queue.empty():
-                    event, data = self.signals.sio_queue.get()
+                for event, data in self.signals.sio_queue.drain():
                     # print(f"Sending {event} with {data}")
-                    await sio.emit(event, data)
+                    if event == "state_batch":
+                        # Signals.batch_update로 묶인 상태 변경은 개별 이벤트로 풀어서 전송
+                        for name, value in data.items():
+                            await sio.emit(name, value)
+                    else:
+                        await sio.emit(event, data)
                 await sio.sleep(0.1)
 
         async def init_app():
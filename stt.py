@@ -18,7 +18,7 @@ class STT:
         print("STT OUTPUT: " + text)
         self.signals.history.append({"role": "user", "content": text})
 
-        self.signals.last_message_time = time.time()
+        self.signals.last_message_time = time.monotonic()
         if not self.signals.AI_speaking:
             self.signals.new_message = True
 
@@ -3,14 +3,22 @@ Base tool classes and interfaces
 Based on AIAvatarKit mixed_tools_server tool architecture
 """
 import time
+import asyncio
 import logging
+from collections import deque
 from abc import ABC, abstractmethod
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List, Callable, Awaitable
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Number of recent executions used for average_response_time
+PERFORMANCE_HISTORY_SIZE = 50
+
+# Default cap on tools running at once in execute_tools_concurrent
+MAX_CONCURRENT_TOOLS = 8
+
 class ToolType(Enum):
     STATIC = "static"           # 항상 사용 가능 (예: 메모리 검색)
     DYNAMIC = "dynamic"         # 상황별 로드 (예: 날씨, 웹검색)
@@ -22,7 +30,7 @@ class ToolStatus(Enum):
     ERROR = "error"
     DISABLED = "disabled"
 
-@dataclass
+@dataclass(slots=True)
 class ToolExecutionStatus:
     """Real-time tool execution status"""
     is_running: bool = False
@@ -32,7 +40,7 @@ class ToolExecutionStatus:
     estimated_completion: Optional[float] = None
     user_request: Optional[str] = None
     
-@dataclass
+@dataclass(slots=True)
 class ToolMetadata:
     name: str
     type: ToolType
@@ -51,7 +59,9 @@ class BaseTool(ABC):
     
     def __init__(self, metadata: ToolMetadata):
         self.metadata = metadata
-        self._performance_history = []
+        # Rolling window of execution times with a running sum, so the average is O(1)
+        self._performance_history = deque(maxlen=PERFORMANCE_HISTORY_SIZE)
+        self._perf_sum = 0.0
         self._progress_callback: Optional[Callable[[str], Awaitable[None]]] = None
     
     @abstractmethod
@@ -103,15 +113,15 @@ class BaseTool(ABC):
             
             # Update performance metrics
             execution_time = time.time() - start_time
-            self._performance_history.append(execution_time)
+            history = self._performance_history
+            if len(history) == history.maxlen:
+                # The oldest entry is about to be evicted by append
+                self._perf_sum -= history[0]
+            history.append(execution_time)
+            self._perf_sum += execution_time
             
             # Calculate average response time
-            if self._performance_history:
-                self.metadata.average_response_time = sum(self._performance_history) / len(self._performance_history)
-            
-            # Keep only recent performance history
-            if len(self._performance_history) > 50:
-                self._performance_history = self._performance_history[-50:]
+            self.metadata.average_response_time = self._perf_sum / len(history)
             
             # Finalize execution status
             self.metadata.execution_status.progress = 1.0
@@ -147,6 +157,10 @@ class BaseTool(ABC):
             logger.error(f"Tool {self.metadata.name} failed: {e}")
             return error_result
     
+    async def aclose(self):
+        """Release resources held by the tool (HTTP sessions etc.), no-op by default"""
+        pass
+    
     def set_progress_callback(self, callback: Callable[[str], Awaitable[None]]):
         """Set progress callback for real-time updates"""
         self._progress_callback = callback
@@ -183,4 +197,22 @@ class BaseTool(ABC):
         self.metadata.error_count = 0
         self.metadata.average_response_time = 0.0
         self.metadata.last_used = None
-        self._performance_history = []
\ No newline at end of file
+        self._performance_history.clear()
+        self._perf_sum = 0.0
+
+
+async def _run_limited(tool: BaseTool, kwargs: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Run one tool call under the shared concurrency limit"""
+    async with semaphore:
+        try:
+            return await tool.execute_with_monitoring(**kwargs)
+        except Exception as e:
+            # execute_with_monitoring already catches tool errors, this covers e.g. bad kwargs
+            logger.error(f"Tool {tool.metadata.name} failed: {e}")
+            return {"error": str(e), "tool_name": tool.metadata.name}
+
+async def execute_tools_concurrent(calls: List[Tuple[BaseTool, Dict[str, Any]]],
+                                   max_concurrency: int = MAX_CONCURRENT_TOOLS) -> List[Dict[str, Any]]:
+    """Run independent tool calls concurrently, results are returned in input order"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    return await asyncio.gather(*[_run_limited(tool, kwargs, semaphore) for tool, kwargs in calls])
@@ -2,17 +2,74 @@
 Math Tool - Dynamic tool for mathematical calculations
 Based on AIAvatarKit math_tool implementation
 """
+import ast
 import logging
 import math
 import re
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 from ..base.tool_base import BaseTool, ToolMetadata, ToolType
 
 logger = logging.getLogger(__name__)
 
+# AST nodes allowed in a math expression (names and calls are limited to MathTool._ALLOWED_NAMES at eval time)
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Call, ast.keyword, ast.Name, ast.Load, ast.Tuple,
+    ast.Compare, ast.Eq,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd
+)
+
+@lru_cache(maxsize=256)
+def _compile_expression(expression: str):
+    """Parse, whitelist-check and compile an expression once per distinct string"""
+    tree = ast.parse(expression, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+            raise ValueError("Only direct calls to math functions are allowed")
+        if isinstance(node, ast.keyword) and node.arg is None:
+            raise ValueError("Unsupported syntax: **")
+    return compile(tree, "<math>", "eval")
+
 class MathTool(BaseTool):
     """Tool for performing mathematical calculations"""
     
+    # OpenAI function spec, built once and shared by every get_spec() call
+    _SPEC = MappingProxyType({
+        "name": "calculate_math",
+        "description": "Perform mathematical calculations, solve equations, and evaluate expressions",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "expression": {
+                    "type": "string",
+                    "description": "Mathematical expression to evaluate (e.g., '2+2', 'sqrt(16)', 'sin(pi/2)')"
+                }
+            },
+            "required": ["expression"]
+        }
+    })
+    
+    # Dangerous keywords, matched as substrings anywhere in the expression
+    _DANGEROUS_RE = re.compile(
+        r"import|exec|eval|open|file|input|raw_input|__|getattr|setattr|delattr|"
+        r"globals|locals|vars|dir|help|reload|compile",
+        re.IGNORECASE
+    )
+    # Any character outside digits, letters, operators, parentheses, '=', ',' and space
+    _DISALLOWED_CHARS_RE = re.compile(r"[^0-9A-Za-z+\-*/().= ,]")
+    
+    # Basic math functions available to expressions
+    _ALLOWED_NAMES = {
+        "abs": abs, "round": round, "min": min, "max": max,
+        "sum": sum, "pow": pow, "sqrt": math.sqrt,
+        "sin": math.sin, "cos": math.cos, "tan": math.tan,
+        "log": math.log, "log10": math.log10,
+        "pi": math.pi, "e": math.e
+    }
+    
     def __init__(self):
         metadata = ToolMetadata(
             name="calculate_math",
@@ -35,17 +92,9 @@ class MathTool(BaseTool):
                     "expression": expression
                 }
             
-            # Evaluate expression safely
-            # Allow basic math functions
-            allowed_names = {
-                "abs": abs, "round": round, "min": min, "max": max,
-                "sum": sum, "pow": pow, "sqrt": math.sqrt,
-                "sin": math.sin, "cos": math.cos, "tan": math.tan,
-                "log": math.log, "log10": math.log10,
-                "pi": math.pi, "e": math.e
-            }
-            
-            result = eval(cleaned_expr, {"__builtins__": {}}, allowed_names)
+            # Evaluate expression safely (compiled code is cached per expression)
+            code = _compile_expression(cleaned_expr)
+            result = eval(code, {"__builtins__": {}}, self._ALLOWED_NAMES)
             
             return {
                 "status": "success",
@@ -78,38 +127,9 @@ class MathTool(BaseTool):
     
     def _is_safe_expression(self, expression: str) -> bool:
         """Check if expression is safe to evaluate"""
-        # Block dangerous keywords
-        dangerous_keywords = [
-            "import", "exec", "eval", "open", "file", "input", "raw_input",
-            "__", "getattr", "setattr", "delattr", "globals", "locals",
-            "vars", "dir", "help", "reload", "compile"
-        ]
-        
-        expression_lower = expression.lower()
-        for keyword in dangerous_keywords:
-            if keyword in expression_lower:
-                return False
-        
-        # Only allow specific characters
-        allowed_chars = set("0123456789+-*/().= abcdefghijklmnopqrstuvwxyz,")
-        if not all(c.lower() in allowed_chars for c in expression):
-            return False
-        
-        return True
+        # Block dangerous keywords and only allow specific characters
+        return not (self._DANGEROUS_RE.search(expression) or self._DISALLOWED_CHARS_RE.search(expression))
     
-    def get_spec(self) -> Dict[str, Any]:
-        """Get OpenAI function calling specification"""
-        return {
-            "name": "calculate_math",
-            "description": "Perform mathematical calculations, solve equations, and evaluate expressions",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "expression": {
-                        "type": "string",
-                        "description": "Mathematical expression to evaluate (e.g., '2+2', 'sqrt(16)', 'sin(pi/2)')"
-                    }
-                },
-                "required": ["expression"]
-            }
-        }
\ No newline at end of file
+    def get_spec(self) -> Mapping[str, Any]:
+        """Get OpenAI function calling specification (shared, read-only)"""
+        return self._SPEC
@@ -2,16 +2,43 @@
 Weather Tool - Dynamic tool for weather information
 Based on AIAvatarKit weather_tool implementation
 """
+import asyncio
 import logging
-import requests
-from typing import Dict, Any
+import time
+import aiohttp
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 from ..base.tool_base import BaseTool, ToolMetadata, ToolType
 
 logger = logging.getLogger(__name__)
 
+# How long an idle pooled connection to wttr.in is kept open for reuse (seconds)
+KEEPALIVE_SECONDS = 60
+
+# Weather changes slowly, so recent lookups are served from memory
+CACHE_TTL_SECONDS = 300
+CACHE_MAX_ENTRIES = 128
+
 class WeatherTool(BaseTool):
     """Tool for getting weather information"""
     
+    # OpenAI function spec, built once and shared by every get_spec() call
+    _SPEC = MappingProxyType({
+        "name": "get_weather",
+        "description": "Get current weather information for a specific location",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "Location name (city, country) for weather lookup"
+                }
+            },
+            "required": ["location"]
+        }
+    })
+    
     def __init__(self, http_session=None):
         metadata = ToolMetadata(
             name="get_weather",
@@ -20,16 +47,67 @@ class WeatherTool(BaseTool):
             version="1.0.0"
         )
         super().__init__(metadata)
+        # Shared session so repeated lookups reuse the pooled TCP/TLS connection
+        self._session = http_session
+        self._owns_session = http_session is None
+        self._session_loop = None
+        # location key -> (monotonic fetch time, weather_info), least recently used first
+        self._cache = OrderedDict()
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the session on the running loop (sessions are bound to the loop that created them)"""
+        if not self._owns_session:
+            return self._session
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed:
+                # Driven from a different loop now, release the old session instead of leaking it
+                await self._close_stale_session(self._session, self._session_loop)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(keepalive_timeout=KEEPALIVE_SECONDS),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+            self._session_loop = loop
+        return self._session
+    
+    @staticmethod
+    async def _close_stale_session(session: aiohttp.ClientSession, session_loop):
+        """Close a session that belongs to another event loop"""
+        try:
+            if session_loop is not None and session_loop.is_running():
+                # Still alive in another thread, close it there
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), session_loop))
+            else:
+                await session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close stale weather session: {e}")
+    
+    async def aclose(self):
+        """Close the session if this tool created it"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def execute(self, location: str) -> Dict[str, Any]:
         """Get weather information for a location"""
+        key = location.strip().lower()
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < CACHE_TTL_SECONDS:
+            self._cache.move_to_end(key)
+            return {
+                "status": "success",
+                "weather": dict(cached[1], location=location),
+                "location": location
+            }
+        
         try:
-            # Use synchronous requests to avoid event loop issues
             url = f"https://wttr.in/{location}?format=j1"
             
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            weather_data = response.json()
+            # Non-blocking request so other tool calls keep running while we wait on the network
+            session = await self._get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                weather_data = await response.json(content_type=None)
             
             if "current_condition" in weather_data:
                 current = weather_data["current_condition"][0]
@@ -45,6 +123,11 @@ class WeatherTool(BaseTool):
                     "visibility": f"{current.get('visibility', 'N/A')} km"
                 }
                 
+                self._cache[key] = (time.monotonic(), dict(weather_info))
+                self._cache.move_to_end(key)
+                if len(self._cache) > CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+                
                 return {
                     "status": "success",
                     "weather": weather_info,
@@ -64,19 +147,6 @@ class WeatherTool(BaseTool):
                 "location": location
             }
     
-    def get_spec(self) -> Dict[str, Any]:
-        """Get OpenAI function calling specification"""
-        return {
-            "name": "get_weather",
-            "description": "Get current weather information for a specific location",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "location": {
-                        "type": "string",
-                        "description": "Location name (city, country) for weather lookup"
-                    }
-                },
-                "required": ["location"]
-            }
-        }
\ No newline at end of file
+    def get_spec(self) -> Mapping[str, Any]:
+        """Get OpenAI function calling specification (shared, read-only)"""
+        return self._SPEC
@@ -4,14 +4,54 @@ Based on AIAvatarKit web_search_tool implementation
 """
 import logging
 import asyncio
-from typing import Dict, Any
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 from ..base.tool_base import BaseTool, ToolMetadata, ToolType
 
+# duckduckgo_search is optional, the tool reports an error when it is missing
+try:
+    from duckduckgo_search import DDGS
+except ImportError:
+    DDGS = None
+
 logger = logging.getLogger(__name__)
 
+# Identical searches within this window are answered from memory
+CACHE_TTL_SECONDS = 120
+CACHE_MAX_ENTRIES = 64
+
+# Concurrent DuckDuckGo searches, more than this mostly runs into rate limits
+MAX_CONCURRENT_SEARCHES = 5
+
 class WebSearchTool(BaseTool):
     """Tool for searching the web using DuckDuckGo"""
     
+    # OpenAI function spec, built once and shared by every get_spec() call
+    _SPEC = MappingProxyType({
+        "name": "search_web",
+        "description": "Search the web for current information and news using DuckDuckGo",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Search query to find relevant web content"
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum number of search results to return",
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": 10
+                }
+            },
+            "required": ["query"]
+        }
+    })
+    
     def __init__(self):
         metadata = ToolMetadata(
             name="search_web",
@@ -20,47 +60,69 @@ class WebSearchTool(BaseTool):
             version="1.0.0"
         )
         super().__init__(metadata)
+        # One DDGS client per worker thread, DDGS is not thread-safe but is reused so
+        # its HTTP client is not rebuilt every call
+        self._local = threading.local()
+        # (query key, max_results) -> (monotonic search time, search_results), least recently used first
+        self._cache = OrderedDict()
+        self._search_slots = None
+        self._search_slots_loop = None
+    
+    def _get_search_slots(self) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent searches, recreated if the tool is driven from another loop"""
+        loop = asyncio.get_running_loop()
+        if self._search_slots is None or self._search_slots_loop is not loop:
+            self._search_slots = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+            self._search_slots_loop = loop
+        return self._search_slots
+    
+    def _search(self, query: str, max_results: int) -> list:
+        """Run a search with this worker thread's DDGS client (blocks on the network)"""
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            ddgs = self._local.ddgs = DDGS()
+        try:
+            return list(ddgs.text(query, max_results=max_results))
+        except Exception:
+            # The client may be left in a bad state, start fresh on this thread's next search
+            self._local.ddgs = None
+            raise
     
     async def execute(self, query: str, max_results: int = 5) -> Dict[str, Any]:
         """Search the web for information"""
+        key = (query.strip().lower(), max_results)
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < CACHE_TTL_SECONDS:
+            self._cache.move_to_end(key)
+            return self._build_response(query, list(cached[1]))
+        
         try:
-            # Import duckduckgo_search locally to avoid dependency issues
-            try:
-                from duckduckgo_search import DDGS
-            except ImportError:
+            if DDGS is None:
                 return {
                     "status": "error",
                     "error": "duckduckgo_search package not installed. Please install with: pip install duckduckgo_search",
                     "query": query
                 }
             
-            # Perform web search
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=max_results))
+            # Perform web search in a worker thread, ddgs.text blocks on the network
+            async with self._get_search_slots():
+                results = await asyncio.to_thread(self._search, query, max_results)
             
-            if results:
-                search_results = []
-                for result in results:
-                    search_results.append({
-                        "title": result.get("title", ""),
-                        "body": result.get("body", ""),
-                        "href": result.get("href", "")
-                    })
-                
-                return {
-                    "status": "success",
-                    "results": search_results,
-                    "query": query,
-                    "total_found": len(search_results)
-                }
-            else:
-                return {
-                    "status": "success",
-                    "results": [],
-                    "query": query,
-                    "total_found": 0,
-                    "message": "No search results found"
+            search_results = [
+                {
+                    "title": result.get("title", ""),
+                    "body": result.get("body", ""),
+                    "href": result.get("href", "")
                 }
+                for result in results
+            ]
+            
+            self._cache[key] = (time.monotonic(), search_results)
+            self._cache.move_to_end(key)
+            if len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+            
+            return self._build_response(query, list(search_results))
                 
         except Exception as e:
             return {
@@ -69,26 +131,23 @@ class WebSearchTool(BaseTool):
                 "query": query
             }
     
-    def get_spec(self) -> Dict[str, Any]:
-        """Get OpenAI function calling specification"""
-        return {
-            "name": "search_web",
-            "description": "Search the web for current information and news using DuckDuckGo",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Search query to find relevant web content"
-                    },
-                    "max_results": {
-                        "type": "integer",
-                        "description": "Maximum number of search results to return",
-                        "default": 5,
-                        "minimum": 1,
-                        "maximum": 10
-                    }
-                },
-                "required": ["query"]
+    def _build_response(self, query: str, search_results: list) -> Dict[str, Any]:
+        """Wrap search results in the tool's response format"""
+        if search_results:
+            return {
+                "status": "success",
+                "results": search_results,
+                "query": query,
+                "total_found": len(search_results)
             }
-        }
\ No newline at end of file
+        return {
+            "status": "success",
+            "results": [],
+            "query": query,
+            "total_found": 0,
+            "message": "No search results found"
+        }
+    
+    def get_spec(self) -> Mapping[str, Any]:
+        """Get OpenAI function calling specification (shared, read-only)"""
+        return self._SPEC
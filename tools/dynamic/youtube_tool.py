@@ -7,14 +7,54 @@ import webbrowser
 import subprocess
 import platform
 import os
-from typing import Dict, Any
+import shutil
+from urllib.parse import quote_plus
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
 from ..base.tool_base import BaseTool, ToolMetadata, ToolType
 
 logger = logging.getLogger(__name__)
 
+# Platform detection does not change while running, resolve the opener command once
+_SYSTEM = platform.system().lower()
+_IS_WSL = _SYSTEM == "linux" and os.path.exists('/mnt/c')
+if _IS_WSL:
+    # WSL: Use Windows start command
+    _OPENER = ["/mnt/c/Windows/System32/cmd.exe", "/c", "start"]
+elif _SYSTEM == "darwin":  # macOS
+    _OPENER = ["open"]
+elif _SYSTEM == "linux":
+    _OPENER = ["xdg-open"]
+else:
+    _OPENER = None
+# Absolute path for os.posix_spawn, which does not search PATH
+_OPENER_PATH = shutil.which(_OPENER[0]) if _OPENER else None
+
 class YouTubeTool(BaseTool):
     """Tool for searching and playing YouTube videos"""
     
+    # OpenAI function spec, built once and shared by every get_spec() call
+    _SPEC = MappingProxyType({
+        "name": "play_youtube_video",
+        "description": "Search and play videos on YouTube",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Video title, keywords, or artist name to search for"
+                },
+                "action": {
+                    "type": "string", 
+                    "enum": ["search", "play"],
+                    "description": "Action to perform: search (search only) or play (search and play, default)",
+                    "default": "play"
+                }
+            },
+            "required": ["query"]
+        }
+    })
+    
     def __init__(self):
         metadata = ToolMetadata(
             name="play_youtube_video",
@@ -23,6 +63,8 @@ class YouTubeTool(BaseTool):
             version="1.0.0"
         )
         super().__init__(metadata)
+        # PIDs of opener processes started with posix_spawn that have not been reaped yet
+        self._children = []
     
     async def execute(self, query: str, action: str = "play") -> Dict[str, Any]:
         """Execute YouTube video search and play"""
@@ -37,14 +79,11 @@ class YouTubeTool(BaseTool):
             query = query.strip()
             logger.info(f"YouTube tool called with: query='{query}', action='{action}'")
             
-            # Create YouTube URL
+            # Create YouTube URL (both actions open the search results page)
+            youtube_url = f"https://www.youtube.com/results?search_query={quote_plus(query)}"
             if action == "search":
-                # Open search results page
-                youtube_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
                 title = f"Search results for '{query}'"
             else:
-                # Direct search URL (will show first result)
-                youtube_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
                 title = f"Playing '{query}'"
             
             # Open browser (non-blocking)
@@ -76,31 +115,19 @@ class YouTubeTool(BaseTool):
     def _open_browser(self, url: str) -> bool:
         """Open browser with URL (non-blocking)"""
         try:
-            system = platform.system().lower()
-            is_wsl = os.path.exists('/mnt/c') and system == "linux"
-            
             # Platform-specific browser opening
-            if system == "windows" or is_wsl:
-                if is_wsl:
-                    # WSL: Use Windows start command
-                    subprocess.Popen(["/mnt/c/Windows/System32/cmd.exe", "/c", "start", url],
-                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                                   start_new_session=True)
-                else:
-                    # Windows: Use os.startfile
-                    import threading
-                    threading.Thread(target=lambda: os.startfile(url), daemon=True).start()
+            if _SYSTEM == "windows":
+                # Windows: os.startfile hands the URL to the shell and returns immediately
+                os.startfile(url)
                 return True
                 
-            elif system == "darwin":  # macOS
-                subprocess.Popen(["open", url], 
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                               start_new_session=True)
+            if _OPENER_PATH and hasattr(os, "posix_spawn"):
+                self._spawn_opener(url)
                 return True
                 
-            elif system == "linux":
-                subprocess.Popen(["xdg-open", url],
-                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, 
+            if _OPENER:
+                subprocess.Popen([*_OPENER, url],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
                                start_new_session=True)
                 return True
             
@@ -117,25 +144,26 @@ class YouTubeTool(BaseTool):
             except:
                 return False
     
-    def get_spec(self) -> Dict[str, Any]:
-        """Get OpenAI function calling specification"""
-        return {
-            "name": "play_youtube_video",
-            "description": "Search and play videos on YouTube",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Video title, keywords, or artist name to search for"
-                    },
-                    "action": {
-                        "type": "string", 
-                        "enum": ["search", "play"],
-                        "description": "Action to perform: search (search only) or play (search and play, default)",
-                        "default": "play"
-                    }
-                },
-                "required": ["query"]
-            }
-        }
\ No newline at end of file
+    def _spawn_opener(self, url: str):
+        """Start the opener with posix_spawn (no fork of this process), detached and silenced"""
+        self._reap_children()
+        devnull = [(os.POSIX_SPAWN_OPEN, fd, os.devnull, os.O_WRONLY, 0) for fd in (1, 2)]
+        pid = os.posix_spawn(_OPENER_PATH, [*_OPENER, url], os.environ,
+                             file_actions=devnull, setsid=True)
+        self._children.append(pid)
+    
+    def _reap_children(self):
+        """Collect exited opener processes so they do not linger as zombies"""
+        alive = []
+        for pid in self._children:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                continue
+            if done == 0:
+                alive.append(pid)
+        self._children = alive
+    
+    def get_spec(self) -> Mapping[str, Any]:
+        """Get OpenAI function calling specification (shared, read-only)"""
+        return self._SPEC
@@ -3,8 +3,8 @@ Tool Registry - Centralized tool management system
 Based on AIAvatarKit mixed_tools_server tool registry
 """
 import logging
-from typing import Dict, List, Optional, Any
-from ..base.tool_base import BaseTool, ToolType, ToolStatus
+from typing import Dict, List, Optional, Any, Tuple
+from ..base.tool_base import BaseTool, ToolType, ToolStatus, MAX_CONCURRENT_TOOLS, execute_tools_concurrent
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +14,8 @@ class ToolRegistry:
     def __init__(self):
         self.tools: Dict[str, BaseTool] = {}
         self.tool_groups: Dict[str, List[str]] = {}
+        # Bumped on every (un)registration so callers can invalidate cached selections
+        self.version = 0
     
     def register_tool(self, tool: BaseTool, group: str = "default") -> bool:
         """Register a tool in the registry"""
@@ -26,6 +28,7 @@ class ToolRegistry:
             
             # Register the tool
             self.tools[tool_name] = tool
+            self.version += 1
             
             # Add to group
             if group not in self.tool_groups:
@@ -49,6 +52,7 @@ class ToolRegistry:
             
             # Remove from tools
             del self.tools[tool_name]
+            self.version += 1
             
             # Remove from groups
             for group_name, tool_list in self.tool_groups.items():
@@ -98,13 +102,40 @@ class ToolRegistry:
                 running_tools.append(tool.get_execution_status())
         return running_tools
     
+    async def execute_many(self, calls: List[Tuple[str, Dict[str, Any]]],
+                           max_concurrency: int = MAX_CONCURRENT_TOOLS) -> List[Dict[str, Any]]:
+        """Execute independent (tool_name, kwargs) calls concurrently, results in input order"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        runnable = []
+        indices = []
+        for i, (tool_name, kwargs) in enumerate(calls):
+            tool = self.tools.get(tool_name)
+            if tool is None:
+                results[i] = {"error": f"Tool {tool_name} not found", "tool_name": tool_name}
+            else:
+                runnable.append((tool, kwargs))
+                indices.append(i)
+        
+        for i, result in zip(indices, await execute_tools_concurrent(runnable, max_concurrency)):
+            results[i] = result
+        return results
+    
+    async def aclose(self):
+        """Release resources held by every registered tool"""
+        for name, tool in self.tools.items():
+            try:
+                await tool.aclose()
+            except Exception as e:
+                logger.error(f"Failed to close tool {name}: {e}")
+    
     def get_tool_specs(self, tool_type: Optional[ToolType] = None) -> List[Dict[str, Any]]:
         """Get tool specifications for LLM"""
         specs = []
         for tool in self.tools.values():
             if tool.metadata.status == ToolStatus.AVAILABLE:
                 if tool_type is None or tool.metadata.type == tool_type:
-                    specs.append(tool.get_spec())
+                    # Specs are shared read-only mappings, hand out plain dicts for serialization
+                    specs.append(dict(tool.get_spec()))
         return specs
     
     def get_registry_status(self) -> Dict[str, Any]:
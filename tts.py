@@ -43,7 +43,7 @@ class TTS:
         self.signals.AI_speaking = True
 
     def audio_ended(self):
-        self.signals.last_message_time = time.time()
+        self.signals.last_message_time = time.monotonic()
         self.signals.AI_speaking = False
 
     class API:
@@ -76,7 +76,7 @@ class WebSocketServer:
             # Add to conversation history like STT does
             formatted_message = f"{chat_data['user_id']}: {chat_data['text']}"
             self.signals.history.append({"role": "user", "content": formatted_message})
-            self.signals.last_message_time = time.time()
+            self.signals.last_message_time = time.monotonic()
             
             # Trigger LLM processing if AI is not currently speaking or thinking
             if not self.signals.AI_speaking and not self.signals.AI_thinking:
@@ -184,52 +184,53 @@ class WebSocketServer:
                 await asyncio.sleep(0.05)  # More frequent polling
                 
                 # Monitor sio_queue for complete messages only
-                while not self.signals.sio_queue.empty():
-                    event, data = self.signals.sio_queue.get()
-                    
-                    if event == "next_chunk":
-                        # Accumulate chunks but don't broadcast yet
-                        current_ai_message += data
+                for event, data in self.signals.sio_queue.drain():
+                    # Signals.batch_update로 묶인 상태 변경은 개별 이벤트로 풀어서 처리
+                    events = data.items() if event == "state_batch" else ((event, data),)
+                    for event, data in events:
+                        if event == "next_chunk":
+                            # Accumulate chunks but don't broadcast yet
+                            current_ai_message += data
                         
-                    elif event == "reset_next_message":
-                        # AI response complete - send full message at once
-                        if current_ai_message.strip():
-                            await self.broadcast_ai_response(current_ai_message)
-                        current_ai_message = ""
+                        elif event == "reset_next_message":
+                            # AI response complete - send full message at once
+                            if current_ai_message.strip():
+                                await self.broadcast_ai_response(current_ai_message)
+                            current_ai_message = ""
                         
-                    elif event == "ai_response_complete":
-                        # Direct complete AI message from LLM wrapper
-                        await self.broadcast_ai_response(data)
+                        elif event == "ai_response_complete":
+                            # Direct complete AI message from LLM wrapper
+                            await self.broadcast_ai_response(data)
                         
-                    elif event == "AI_thinking":
-                        # Broadcast AI thinking status
-                        message = {
-                            "type": "ai_status",
-                            "data": {"thinking": data, "speaking": self.signals.AI_speaking},
-                            "timestamp": time.time()
-                        }
-                        print(f"[WS PUSH] AI thinking status to {len(self.clients)} clients: {data}")
-                        await self.broadcast(json.dumps(message))
+                        elif event == "AI_thinking":
+                            # Broadcast AI thinking status
+                            message = {
+                                "type": "ai_status",
+                                "data": {"thinking": data, "speaking": self.signals.AI_speaking},
+                                "timestamp": time.time()
+                            }
+                            print(f"[WS PUSH] AI thinking status to {len(self.clients)} clients: {data}")
+                            await self.broadcast(json.dumps(message))
                         
-                    elif event == "AI_speaking":
-                        # Broadcast AI speaking status
-                        message = {
-                            "type": "ai_status", 
-                            "data": {"thinking": self.signals.AI_thinking, "speaking": data},
-                            "timestamp": time.time()
-                        }
-                        print(f"[WS PUSH] AI speaking status to {len(self.clients)} clients: {data}")
-                        await self.broadcast(json.dumps(message))
+                        elif event == "AI_speaking":
+                            # Broadcast AI speaking status
+                            message = {
+                                "type": "ai_status", 
+                                "data": {"thinking": self.signals.AI_thinking, "speaking": data},
+                                "timestamp": time.time()
+                            }
+                            print(f"[WS PUSH] AI speaking status to {len(self.clients)} clients: {data}")
+                            await self.broadcast(json.dumps(message))
                         
-                    elif event == "full_prompt":
-                        # Broadcast the full prompt being sent to AI
-                        message = {
-                            "type": "ai_prompt",
-                            "data": data,
-                            "timestamp": time.time()
-                        }
-                        print(f"[WS PUSH] AI prompt to {len(self.clients)} clients: {len(data)} chars")
-                        await self.broadcast(json.dumps(message))
+                        elif event == "full_prompt":
+                            # Broadcast the full prompt being sent to AI
+                            message = {
+                                "type": "ai_prompt",
+                                "data": data,
+                                "timestamp": time.time()
+                            }
+                            print(f"[WS PUSH] AI prompt to {len(self.clients)} clients: {len(data)} chars")
+                            await self.broadcast(json.dumps(message))
                         
             except Exception as e:
                 print(f"AI response monitoring error: {e}")